@@ -0,0 +1,200 @@
+"""Response cache for the agent REPL - exact and semantic tiers."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional
+
+import numpy as np
+
+from agent.config import (
+    CONFIDENCE_THRESHOLDS,
+    RESPONSE_CACHE_DIR, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_MIN_OVERLAP,
+    RESPONSE_CACHE_TTL
+)
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+class _MemoryStore:
+    """In-memory stand-in for diskcache.Cache's get/set with expiry."""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None):
+        expires_at = None if expire is None else time.monotonic() + expire
+        self._data[key] = (expires_at, value)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for agent responses.
+
+    1. Exact tier - responses on disk, keyed by normalized query + LLM mode
+    2. Semantic tier - recent query embeddings per mode; a re-phrasing
+       reuses the response cached for the earlier query
+
+    Queries can embed almost identically yet ask for different data
+    ("Dell stipend" / "Intel stipend", "stipend more than 30000" / "...
+    50000"), so a re-phrasing hit needs, besides cosine >= threshold:
+    - the same numbers in both queries
+    - evidence: the companies a cheap retrieval (retrieve_companies) finds
+      for both queries overlap by Jaccard >= min_overlap; when it finds
+      none for either, there is nothing to compare and the tier is skipped
+
+    Without retrieve_companies only the exact tier is used.
+
+    Keys also include the index files' modification times, so rebuilding
+    the indices invalidates everything cached before, and entries expire
+    after ttl seconds. Fallback and low-confidence responses aren't cached.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = RESPONSE_CACHE_DIR,
+        max_recent: int = RESPONSE_CACHE_SIZE,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        retrieve_companies: Optional[Callable[[str], Iterable[str]]] = None,
+        min_overlap: float = RESPONSE_CACHE_MIN_OVERLAP,
+        ttl: Optional[float] = RESPONSE_CACHE_TTL
+    ):
+        self.max_recent = max_recent
+        self.threshold = threshold
+        self.retrieve_companies = retrieve_companies
+        self.min_overlap = min_overlap
+        self.ttl = ttl
+        self._store = self._open_store(os.path.expanduser(cache_dir))
+        self._version = self._data_version()
+        self._embedder = None
+        # use_llm -> (faiss index over query embeddings, [(exact key, numbers, companies)])
+        self._recent: Dict[bool, tuple] = {}
+
+    @staticmethod
+    def _open_store(cache_dir: str):
+        """Open the on-disk store, falling back to memory without diskcache."""
+        try:
+            import diskcache
+            return diskcache.Cache(cache_dir)
+        except ImportError:
+            logger.warning("diskcache not installed, caching responses in memory only")
+            return _MemoryStore()
+
+    @staticmethod
+    def _data_version() -> str:
+        """Fingerprint of the indices the answers were computed from."""
+        from rag.config import FACTS_INDEX_FILE, FAISS_INDEX_FILE
+
+        parts = []
+        for path in (FACTS_INDEX_FILE, FAISS_INDEX_FILE):
+            try:
+                parts.append(str(os.stat(path).st_mtime_ns))
+            except OSError:
+                parts.append('-')
+        return ':'.join(parts)
+
+    def _key(self, query: str, use_llm: bool) -> str:
+        normalized = ' '.join(query.lower().split())
+        raw = f"{normalized}|{use_llm}|{self._version}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _numbers(query: str) -> FrozenSet[str]:
+        """Numbers in a query (thousands separators dropped)."""
+        return frozenset(_NUMBER_RE.findall(query.replace(',', '')))
+
+    def _companies(self, query: str) -> FrozenSet[str]:
+        return frozenset(c.lower() for c in self.retrieve_companies(query))
+
+    def _same_evidence(self, a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+        """Whether two queries retrieve (mostly) the same companies."""
+        if not a or not b:
+            return False
+        return len(a & b) / len(a | b) >= self.min_overlap
+
+    @staticmethod
+    def _cacheable(response: Any) -> bool:
+        """Whether a response is worth reusing: no fallback answer, not in the low confidence bucket."""
+        if getattr(response, 'used_fallback', False):
+            return False
+        feedback = getattr(response, 'feedback', None)
+        return feedback is None or feedback.confidence_score > CONFIDENCE_THRESHOLDS[0]
+
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed a query with the (shared) semantic index embedder."""
+        if self._embedder is None:
+            from rag.semantic_index import SemanticIndex
+            self._embedder = SemanticIndex()
+        return self._embedder.encode_batch([query.strip()])
+
+    def get(self, query: str, use_llm: bool) -> Optional[Any]:
+        """Return a cached response for the query, or None."""
+        key = self._key(query, use_llm)
+        response = self._store.get(key)
+        if response is not None:
+            return response
+
+        recent = self._recent.get(use_llm)
+        if recent is None or recent[0].ntotal == 0:
+            return None
+
+        index, entries = recent
+        scores, indices = index.search(self._embed(query), 1)
+        if indices[0][0] < 0 or scores[0][0] < self.threshold:
+            return None
+        key, numbers, companies = entries[indices[0][0]]
+        # Cheapest gate first: retrieval runs only for a likely hit
+        if numbers != self._numbers(query):
+            return None
+        if not self._same_evidence(companies, self._companies(query)):
+            return None
+        return self._store.get(key)
+
+    def put(self, query: str, use_llm: bool, response: Any):
+        """Cache a response under both tiers."""
+        if not self._cacheable(response):
+            return
+
+        key = self._key(query, use_llm)
+        try:
+            self._store.set(key, response, expire=self.ttl)
+        except Exception as e:
+            logger.warning(f"Could not cache response: {e}")
+            return
+
+        if self.retrieve_companies is None or self.max_recent <= 0:
+            return
+
+        companies = self._companies(query)
+        if not companies:
+            # Nothing to validate a re-phrasing against
+            return
+
+        embedding = self._embed(query)
+        if use_llm not in self._recent:
+            import faiss
+            self._recent[use_llm] = (faiss.IndexFlatIP(embedding.shape[1]), [])
+        index, entries = self._recent[use_llm]
+
+        if index.ntotal >= self.max_recent:
+            index.remove_ids(np.array([0], dtype='int64'))
+            entries.pop(0)
+        index.add(embedding)
+        entries.append((key, self._numbers(query), companies))
@@ -16,3 +16,14 @@ USE_LLM_SYNTHESIZER = True  # Use LLM for response generation
 
 # Fallback to rule-based if LLM fails
 FALLBACK_TO_RULES = True
+
+# Confidence buckets: <= 0.4 low, <= 0.7 medium, above that high
+# (the critic retries only below the first, so 0.4 is low but not retried)
+CONFIDENCE_THRESHOLDS = (0.4, 0.7)
+
+# Response cache (run_agent.py REPL and Streamlit app)
+RESPONSE_CACHE_DIR = "~/.placement_agent_cache"
+RESPONSE_CACHE_SIZE = 256  # Recent queries kept for similarity matching
+RESPONSE_CACHE_THRESHOLD = 0.92  # Cosine similarity for a re-phrasing candidate
+RESPONSE_CACHE_MIN_OVERLAP = 0.7  # Jaccard of the companies both queries retrieve
+RESPONSE_CACHE_TTL = 3600  # Seconds a cached response stays valid
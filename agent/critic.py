@@ -1,11 +1,18 @@
 """LLM-powered Critic - validates results using LLM."""
 
+import bisect
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
 from agent.planner import QueryPlan
 from agent.executor import ExecutionResult
 from agent.llm_client import get_agent_llm
+from agent.config import CONFIDENCE_THRESHOLDS
+
+
+def confidence_level(confidence: float) -> int:
+    """Bucket a confidence score: 0 = low, 1 = medium, 2 = high."""
+    return bisect.bisect_left(CONFIDENCE_THRESHOLDS, confidence)
 
 
 @dataclass
@@ -132,7 +139,7 @@ Return only JSON:"""
             missing_info=[],
             suggestions=[],
             confidence_score=confidence,
-            needs_retry=confidence < 0.4,
+            needs_retry=confidence < CONFIDENCE_THRESHOLDS[0],
             retry_suggestions=[],
             reasoning="Rule-based evaluation"
         )
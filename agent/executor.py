@@ -4,7 +4,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass, field
 
 from tools import FactsLookupTool, SemanticRAGTool, CompareCompaniesTool
@@ -12,6 +12,27 @@ from tools.base_tool import ToolResult
 from agent.planner import QueryPlan, ToolType
 
 
+def companies_in_results(tool_results: List[ToolResult]) -> Set[str]:
+    """Lowercased names of the companies in successful tool results."""
+    companies = set()
+    for result in tool_results:
+        if not result.success or not result.data:
+            continue
+        
+        for r in result.data.get("results", result.data.get("semantic_results", {}).get("results", [])):
+            if r.get("company"):
+                companies.add(r.get("company").lower())
+        
+        for role in result.data.get("roles", []):
+            company = role.get("company", role.get("company_name", ""))
+            if company:
+                companies.add(company.lower())
+        
+        for company in result.data.get("facts_data", {}).keys():
+            companies.add(company.lower())
+    return companies
+
+
 @dataclass
 class ExecutionResult:
     """Result from executing a query plan."""
@@ -150,24 +171,11 @@ class Executor:
         if plan.companies_mentioned:
             companies_to_enrich.update(c.lower() for c in plan.companies_mentioned)
         
-        for result in tool_results:
-            if not result.success or not result.data:
-                continue
-            
-            # Collect companies from results
-            for r in result.data.get("results", result.data.get("semantic_results", {}).get("results", [])):
-                if r.get("company"):
-                    companies_to_enrich.add(r.get("company").lower())
-            
-            for role in result.data.get("roles", []):
-                company = role.get("company", role.get("company_name", ""))
-                if company:
-                    companies_to_enrich.add(company.lower())
-            
-            for company in result.data.get("facts_data", {}).keys():
-                companies_to_enrich.add(company.lower())
+        # Collect companies from results
+        companies_to_enrich.update(companies_in_results(tool_results))
         
         # Enrich each company
+        semantic_requests = []
         for company_lower in companies_to_enrich:
             if not company_lower:
                 continue
@@ -189,15 +197,20 @@ class Executor:
             }
             
             for cat, query in categories.items():
-                sem_result = self.semantic_tool.execute(
-                    query=query, search_type=cat, company=company_lower, top_k=self.SEMANTIC_TOP_K
-                )
-                if sem_result.success and sem_result.data:
-                    results = sem_result.data.get("results", [])
-                    if results:
-                        combined = "\n\n---\n\n".join([
-                            r.get("content", r.get("text", "")) for r in results[:self.SEMANTIC_TOP_K]
-                        ])
-                        enriched[company_display]["semantic"][cat] = combined
+                semantic_requests.append((company_display, cat, {
+                    "query": query, "search_type": cat, "company": company_lower,
+                    "top_k": self.SEMANTIC_TOP_K
+                }))
+        
+        # All companies' category searches in one batch (one embedding pass)
+        sem_results = self.semantic_tool.execute_batch([req for _, _, req in semantic_requests])
+        for (company_display, cat, _), sem_result in zip(semantic_requests, sem_results):
+            if sem_result.success and sem_result.data:
+                results = sem_result.data.get("results", [])
+                if results:
+                    combined = "\n\n---\n\n".join([
+                        r.get("content", r.get("text", "")) for r in results[:self.SEMANTIC_TOP_K]
+                    ])
+                    enriched[company_display]["semantic"][cat] = combined
         
         return enriched
@@ -1,9 +1,9 @@
 """LLM client for agent reasoning."""
 
 import os
-import json
+import orjson
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +44,7 @@ class AgentLLM:
                 gpu_memory_utilization=0.3,
                 trust_remote_code=True,
                 max_model_len=4096,
+                enable_prefix_caching=True,  # System prompts repeat on every call
             )
             self.sampling_params = SamplingParams(
                 temperature=0.1,
@@ -66,14 +67,17 @@ class AgentLLM:
         except Exception as e:
             logger.warning(f"Ollama not available: {e}")
     
+    @staticmethod
+    def _format_prompt(prompt: str, system_prompt: str = None) -> str:
+        if system_prompt:
+            return f"<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant\n"
+        return prompt
+    
     def generate(self, prompt: str, system_prompt: str = None) -> str:
         """Generate response from LLM."""
         self._initialize()
         
-        if system_prompt:
-            full_prompt = f"<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant\n"
-        else:
-            full_prompt = prompt
+        full_prompt = self._format_prompt(prompt, system_prompt)
         
         try:
             if self.use_vllm and self.llm:
@@ -91,6 +95,32 @@ class AgentLLM:
             logger.error(f"LLM generation error: {e}")
             return ""
     
+    def generate_stream(self, prompt: str, system_prompt: str = None) -> Iterator[str]:
+        """
+        Generate response from LLM in chunks as they are produced.
+        
+        Only Ollama streams; with vLLM (offline batch generation) the whole
+        response is yielded as one chunk. Unlike generate, errors are raised:
+        chunks already yielded can't be taken back, so a failure midway must
+        not look like a complete (truncated) response.
+        """
+        self._initialize()
+        
+        if (self.use_vllm and self.llm) or not hasattr(self, 'ollama_client'):
+            yield self.generate(prompt, system_prompt)
+            return
+        
+        try:
+            for chunk in self.ollama_client.generate(
+                model=self.model_name,
+                prompt=self._format_prompt(prompt, system_prompt),
+                stream=True,
+            ):
+                yield chunk['response']
+        except Exception as e:
+            logger.error(f"LLM generation error: {e}")
+            raise
+    
     def generate_json(self, prompt: str, system_prompt: str = None) -> Optional[Dict]:
         """Generate and parse JSON response."""
         response = self.generate(prompt, system_prompt)
@@ -103,7 +133,7 @@ class AgentLLM:
         
         # Try direct parse
         try:
-            return json.loads(response)
+            return orjson.loads(response)
         except:
             pass
         
@@ -119,7 +149,7 @@ class AgentLLM:
             if match:
                 try:
                     json_str = match.group(1) if '```' in pattern else match.group(0)
-                    return json.loads(json_str)
+                    return orjson.loads(json_str)
                 except:
                     continue
         
@@ -4,14 +4,17 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 from agent.planner import Planner, QueryPlan
-from agent.executor import Executor, ExecutionResult
+from agent.executor import Executor, ExecutionResult, companies_in_results
 from agent.critic import Critic, CriticFeedback
 from agent.synthesizer import Synthesizer
-from agent.config import USE_LLM_PLANNER, USE_LLM_CRITIC, USE_LLM_SYNTHESIZER
+from agent.config import (
+    USE_LLM_PLANNER, USE_LLM_CRITIC, USE_LLM_SYNTHESIZER, CONFIDENCE_THRESHOLDS
+)
+from agent.llm_client import get_agent_llm
 
 
 @dataclass
@@ -22,6 +25,7 @@ class AgentResponse:
     execution: ExecutionResult
     feedback: CriticFeedback
     retries: int = 0
+    used_fallback: bool = False  # LLM synthesis failed, answer is rule-based
 
 
 class PlacementAgent:
@@ -43,13 +47,80 @@ class PlacementAgent:
         self.executor = Executor()
         self.critic = Critic(use_llm=use_llm and USE_LLM_CRITIC)
         self.synthesizer = Synthesizer(use_llm=use_llm and USE_LLM_SYNTHESIZER)
+        self.use_llm = use_llm
         
         self.max_retries = 2
-        self.min_confidence = 0.4
+        self.min_confidence = CONFIDENCE_THRESHOLDS[0]
+    
+    def set_use_llm(self, use_llm: bool):
+        """Switch between LLM and rule-based mode without rebuilding tools."""
+        self.use_llm = use_llm
+        for component, enabled in (
+            (self.planner, USE_LLM_PLANNER),
+            (self.critic, USE_LLM_CRITIC),
+            (self.synthesizer, USE_LLM_SYNTHESIZER),
+        ):
+            component.use_llm = use_llm and enabled
+            if component.use_llm and component.llm is None:
+                component.llm = get_agent_llm()
     
     def query(self, user_query: str, verbose: bool = False) -> AgentResponse:
         """Process a user query and return response."""
         
+        plan, result, feedback, retries = self._plan_and_execute(user_query, verbose)
+        
+        # Step 5: Synthesize (LLM-powered)
+        answer = self.synthesizer.synthesize(plan, result, feedback)
+        
+        if verbose:
+            print(f"\n{'='*60}")
+            print("✅ Response generated!")
+            print(f"{'='*60}\n")
+        
+        return AgentResponse(
+            answer=answer,
+            plan=plan,
+            execution=result,
+            feedback=feedback,
+            retries=retries,
+            used_fallback=self.synthesizer.used_fallback
+        )
+    
+    def query_stream(self, user_query: str, verbose: bool = False) -> Tuple[AgentResponse, Iterator[str]]:
+        """
+        Process a user query, streaming the answer.
+        
+        Returns the response and an iterator over answer chunks; the
+        response's answer is filled in once the iterator is exhausted. If
+        generation fails midway the iterator raises and the answer stays
+        empty, so the response must not be cached.
+        """
+        plan, result, feedback, retries = self._plan_and_execute(user_query, verbose)
+        response = AgentResponse(
+            answer="",
+            plan=plan,
+            execution=result,
+            feedback=feedback,
+            retries=retries
+        )
+        
+        def chunks():
+            parts = []
+            for chunk in self.synthesizer.synthesize_stream(plan, result, feedback):
+                parts.append(chunk)
+                yield chunk
+            response.answer = "".join(parts)
+            response.used_fallback = self.synthesizer.used_fallback
+        
+        return response, chunks()
+    
+    def _plan_and_execute(
+        self,
+        user_query: str,
+        verbose: bool
+    ) -> Tuple[QueryPlan, ExecutionResult, CriticFeedback, int]:
+        """Plan, execute and critique (retrying if needed): everything but synthesis."""
+        
         if verbose:
             print(f"\n{'='*60}")
             print(f"🎓 Query: {user_query}")
@@ -97,21 +168,7 @@ class PlacementAgent:
             result = self.executor.execute(plan)
             feedback = self.critic.evaluate(plan, result)
         
-        # Step 5: Synthesize (LLM-powered)
-        answer = self.synthesizer.synthesize(plan, result, feedback)
-        
-        if verbose:
-            print(f"\n{'='*60}")
-            print("✅ Response generated!")
-            print(f"{'='*60}\n")
-        
-        return AgentResponse(
-            answer=answer,
-            plan=plan,
-            execution=result,
-            feedback=feedback,
-            retries=retries
-        )
+        return plan, result, feedback, retries
     
     def _adjust_plan(self, plan: QueryPlan, feedback: CriticFeedback) -> QueryPlan:
         """Adjust plan based on feedback."""
@@ -141,6 +198,21 @@ class PlacementAgent:
         
         return plan
     
+    def retrieved_companies(self, query: str) -> List[str]:
+        """
+        Companies a cheap retrieval finds for a query.
+        
+        Runs the rule-based plan's tools without enrichment, critique or
+        synthesis, so no LLM is called.
+        """
+        companies = self.planner._extract_companies_fuzzy(query)
+        plan = self.planner._analyze_rule_based(query, companies)
+        plan.needs_enrichment = False
+        result = self.executor.execute(plan)
+        found = companies_in_results(result.tool_results)
+        found.update(c.lower() for c in companies)
+        return sorted(found)
+    
     def get_companies(self) -> List[str]:
         """Get list of all available companies."""
         from tools import FactsLookupTool
@@ -153,7 +225,10 @@ class PlacementAgent:
 
 def create_agent(use_llm: bool = True) -> PlacementAgent:
     """Create and initialize the placement agent."""
-    from tools import FactsLookupTool
+    from tools import FactsLookupTool, warm_up
+    
+    # Load indices + embedder up front so the first query doesn't pay for it
+    warm_up()
     
     facts_tool = FactsLookupTool()
     result = facts_tool.execute(action="get_all_companies")
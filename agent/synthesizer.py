@@ -1,6 +1,6 @@
 """LLM-powered Synthesizer - uses LLM to generate natural responses."""
 
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 
 from agent.planner import QueryPlan
 from agent.executor import ExecutionResult
@@ -23,9 +23,12 @@ CRITICAL RULES:
     def __init__(self, use_llm: bool = True):
         self.use_llm = use_llm
         self.llm = get_agent_llm() if use_llm else None
+        # Whether the last synthesis fell back to rule-based after an LLM failure
+        self.used_fallback = False
     
     def synthesize(self, plan: QueryPlan, result: ExecutionResult, feedback: CriticFeedback) -> str:
         """Generate response using LLM."""
+        self.used_fallback = False
         
         # For aggregation, use rule-based (more accurate for counts)
         if plan.intent == "aggregation":
@@ -42,12 +45,73 @@ CRITICAL RULES:
         else:
             return self._synthesize_rule_based(plan, enriched)
     
+    def synthesize_stream(
+        self,
+        plan: QueryPlan,
+        result: ExecutionResult,
+        feedback: CriticFeedback
+    ) -> Iterator[str]:
+        """
+        Generate the response in chunks, streaming the LLM output as it arrives.
+        
+        An LLM error before anything is yielded falls back to the rule-based
+        response (as in synthesize); an error after that is raised, since the
+        answer streamed so far is incomplete.
+        """
+        enriched = result.enriched_results or {}
+        self.used_fallback = False
+        
+        if (
+            plan.intent == "aggregation"
+            or (not enriched and not result.tool_results)
+            or not (self.use_llm and self.llm)
+        ):
+            yield self.synthesize(plan, result, feedback)
+            return
+        
+        # As in synthesize, answers of 50 characters or less fall back to the
+        # rule-based response, so hold output back until it is long enough
+        stream = self.llm.generate_stream(self._llm_prompt(plan, enriched, result), self.SYSTEM_PROMPT)
+        head = ""
+        try:
+            for chunk in stream:
+                head += chunk
+                if self._long_enough(head):
+                    break
+            else:
+                head = ""
+        except Exception:
+            head = ""
+        
+        if not head:
+            self.used_fallback = True
+            yield self._synthesize_rule_based(plan, enriched)
+            return
+        
+        yield head.lstrip()
+        yield from stream
+    
     def _synthesize_with_llm(self, plan: QueryPlan, enriched: Dict[str, Any], result: ExecutionResult) -> str:
         """Use LLM to generate natural response."""
         
+        response = self.llm.generate(self._llm_prompt(plan, enriched, result), self.SYSTEM_PROMPT)
+        
+        if response and self._long_enough(response):
+            return response
+        
+        self.used_fallback = True
+        return self._synthesize_rule_based(plan, enriched)
+    
+    @staticmethod
+    def _long_enough(text: str) -> bool:
+        """Whether LLM output is long enough to use (more than 50 characters, stripped)."""
+        return len(text.strip()) > 50
+    
+    def _llm_prompt(self, plan: QueryPlan, enriched: Dict[str, Any], result: ExecutionResult) -> str:
+        """Prompt asking the LLM to answer from the retrieved data."""
         context = self._build_context(enriched, result)
         
-        prompt = f"""Answer the user's question using ONLY the provided data.
+        return f"""Answer the user's question using ONLY the provided data.
 
 **USER QUESTION:** {plan.original_query}
 
@@ -64,13 +128,6 @@ CRITICAL RULES:
 7. If information is not in the data, say "Not available in database"
 
 **YOUR RESPONSE:**"""
-
-        response = self.llm.generate(prompt, self.SYSTEM_PROMPT)
-        
-        if response and len(response) > 50:
-            return response
-        
-        return self._synthesize_rule_based(plan, enriched)
     
     def _build_context(self, enriched: Dict[str, Any], result: ExecutionResult) -> str:
         """Build comprehensive context for LLM."""
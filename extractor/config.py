@@ -32,6 +32,8 @@ LLM_MODEL = "Qwen/Qwen2.5-32B-Instruct"
 USE_VLLM = True
 VLLM_GPU_MEMORY_UTILIZATION = 0.85  # Use more GPU for larger model
 VLLM_TENSOR_PARALLEL_SIZE = 1  # Use 1 GPU, set to 2 for 70B+ models
+VLLM_ENABLE_PREFIX_CACHING = True  # Reuse KV cache of shared prompt prefixes
+VLLM_MAX_NUM_SEQS = 64  # Sequences scheduled together (continuous batching)
 DEVICE = "cuda:1"  # Use second A100 GPU
 
 # Generation settings
@@ -53,6 +55,9 @@ MAX_CONTENT_LENGTH = 12000  # Max chars per LLM call
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 100
 BATCH_SIZE = 1  # Process one at a time for quality
+# Phase 1 file-reading worker processes; each loads its own OCR model,
+# so keep this within what the OCR GPU can hold
+EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)
 
 # Semantic chunk types
 CHUNK_TYPES = [
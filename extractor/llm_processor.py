@@ -1,13 +1,16 @@
 """LLM processor for extracting structured data from placement documents."""
 
+import asyncio
 import json
 import re
-from typing import Dict, List, Optional, Any
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Any
 import logging
 
 from extractor.config import (
     CHUNK_TYPES, LLM_MODEL, USE_VLLM, 
     VLLM_GPU_MEMORY_UTILIZATION, VLLM_TENSOR_PARALLEL_SIZE,
+    VLLM_ENABLE_PREFIX_CACHING, VLLM_MAX_NUM_SEQS,
     LLM_TEMPERATURE, LLM_MAX_TOKENS, LLM_TOP_P
 )
 
@@ -18,9 +21,14 @@ logger = logging.getLogger(__name__)
 class LLMProcessor:
     """Process text using LLM to extract structured information."""
     
-    def __init__(self, use_vllm: bool = True, model_name: str = None):
+    def __init__(self, use_vllm: bool = True, model_name: str = None, streaming: bool = False):
         self.use_vllm = use_vllm
         self.model_name = model_name or LLM_MODEL
+        # vLLM only: serve through AsyncLLMEngine so generate_stream() yields
+        # text as it is decoded (generate/generate_batch still work)
+        self.streaming = streaming and use_vllm
+        # The async engine's background loop is bound to one event loop
+        self._loop = asyncio.new_event_loop() if self.streaming else None
         self.llm = None
         self._initialize_llm()
     
@@ -40,13 +48,20 @@ class LLMProcessor:
             logger.info(f"GPU Memory Utilization: {VLLM_GPU_MEMORY_UTILIZATION}")
             logger.info(f"Tensor Parallel Size: {VLLM_TENSOR_PARALLEL_SIZE}")
             
-            self.llm = LLM(
+            engine_kwargs = dict(
                 model=self.model_name,
                 tensor_parallel_size=VLLM_TENSOR_PARALLEL_SIZE,
                 gpu_memory_utilization=VLLM_GPU_MEMORY_UTILIZATION,
                 trust_remote_code=True,
                 max_model_len=8192,
+                enable_prefix_caching=VLLM_ENABLE_PREFIX_CACHING,
+                max_num_seqs=VLLM_MAX_NUM_SEQS,
             )
+            if self.streaming:
+                from vllm import AsyncEngineArgs, AsyncLLMEngine
+                self.llm = AsyncLLMEngine.from_engine_args(AsyncEngineArgs(**engine_kwargs))
+            else:
+                self.llm = LLM(**engine_kwargs)
             self.sampling_params = SamplingParams(
                 temperature=LLM_TEMPERATURE,
                 max_tokens=LLM_MAX_TOKENS,
@@ -83,6 +98,8 @@ class LLMProcessor:
     
     def generate(self, prompt: str) -> str:
         """Generate response from LLM."""
+        if self.streaming:
+            return self.run_async(self._generate_async(prompt))
         if self.use_vllm:
             outputs = self.llm.generate([prompt], self.sampling_params)
             return outputs[0].outputs[0].text.strip()
@@ -97,6 +114,47 @@ class LLMProcessor:
             )
             return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
     
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """Generate responses for several prompts (one vLLM batch)."""
+        if self.streaming:
+            return self.run_async(self._generate_batch_async(prompts))
+        if self.use_vllm:
+            outputs = self.llm.generate(prompts, self.sampling_params)
+            return [output.outputs[0].text.strip() for output in outputs]
+        return [self.generate(prompt) for prompt in prompts]
+    
+    def run_async(self, coro):
+        """Run a coroutine that uses this processor (e.g. over generate_stream)."""
+        if self._loop is not None:
+            return self._loop.run_until_complete(coro)
+        return asyncio.run(coro)
+    
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the response as text deltas while it is decoded.
+        
+        Only the streaming vLLM engine streams; other backends yield the
+        whole response once.
+        """
+        if not self.streaming:
+            yield await asyncio.to_thread(self.generate, prompt)
+            return
+        
+        sent = 0
+        async for output in self.llm.generate(prompt, self.sampling_params, str(uuid.uuid4())):
+            text = output.outputs[0].text
+            if len(text) > sent:
+                yield text[sent:]
+                sent = len(text)
+    
+    async def _generate_async(self, prompt: str) -> str:
+        parts = [delta async for delta in self.generate_stream(prompt)]
+        return "".join(parts).strip()
+    
+    async def _generate_batch_async(self, prompts: List[str]) -> List[str]:
+        # Requests submitted together are batched by the engine scheduler
+        return list(await asyncio.gather(*(self._generate_async(p) for p in prompts)))
+    
     def _parse_json_response(self, response: str) -> Optional[Dict]:
         """Parse JSON from LLM response with multiple fallback strategies."""
         # Try direct parse
@@ -132,9 +190,31 @@ class LLMProcessor:
         
         return None
 
+    def extract_entry(self, raw_data: Dict[str, Any]) -> tuple:
+        """Extract facts and semantic chunks with both prompts in one batch."""
+        prompts = [self._facts_prompt(raw_data), self._chunks_prompt(raw_data)]
+        try:
+            facts_response, chunks_response = self.generate_batch(prompts)
+        except Exception as e:
+            logger.error(f"Error generating for {raw_data['primary_key']}: {e}")
+            facts_response = chunks_response = None
+        
+        return (
+            self._facts_from_response(raw_data, facts_response),
+            self._chunks_from_response(raw_data, chunks_response)
+        )
+    
     def extract_facts(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Extract structured facts from raw extraction data."""
-        
+        try:
+            response = self.generate(self._facts_prompt(raw_data))
+        except Exception as e:
+            logger.error(f"Error extracting facts for {raw_data['primary_key']}: {e}")
+            response = None
+        return self._facts_from_response(raw_data, response)
+    
+    def _facts_prompt(self, raw_data: Dict[str, Any]) -> str:
+        """Build the facts extraction prompt."""
         text = raw_data["combined_text"][:10000]
         company_name = raw_data["company_name"]
         role_name = raw_data["role_name"]
@@ -204,9 +284,14 @@ Return ONLY a valid JSON object with no additional text.
 ```
 
 Return only the JSON object:"""
-
+        return prompt
+    
+    def _facts_from_response(self, raw_data: Dict[str, Any], response: Optional[str]) -> Dict[str, Any]:
+        """Parse facts from an LLM response (defaults when it failed)."""
+        if response is None:
+            return self._default_facts(raw_data)
+        
         try:
-            response = self.generate(prompt)
             facts = self._parse_json_response(response)
             
             if facts:
@@ -246,23 +331,26 @@ Return only the JSON object:"""
     
     def extract_semantic_chunks(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract categorized semantic chunks from raw data."""
+        try:
+            response = self.generate(self._chunks_prompt(raw_data))
+        except Exception as e:
+            logger.error(f"Error extracting chunks for {raw_data['primary_key']}: {e}")
+            response = None
+        return self._chunks_from_response(raw_data, response)
+    
+    def _chunks_prompt(self, raw_data: Dict[str, Any]) -> str:
+        """
+        Build the semantic chunk prompt.
         
-        all_chunks = []
+        The instructions come first and are identical for every document, so
+        vLLM prefix caching reuses their KV cache across entries.
+        """
         company = raw_data["company_name"]
         role = raw_data["role_name"]
-        primary_key = raw_data["primary_key"]
-        
-        # Combine all file contents for comprehensive extraction
         combined_content = raw_data["combined_text"][:12000]
         
-        prompt = f"""You are an expert at extracting and categorizing job description content.
-Analyze this placement/internship document and extract detailed information for each category.
-
-### COMPANY: {company}
-### ROLE: {role}
-
-### DOCUMENT CONTENT:
-{combined_content}
+        return f"""You are an expert at extracting and categorizing job description content.
+Analyze the placement/internship document below and extract detailed information for each category.
 
 ### INSTRUCTIONS:
 For each category, extract the ACTUAL text and details from the document. 
@@ -291,11 +379,24 @@ Return ONLY a valid JSON object:
 }}
 ```
 
-Return only the JSON:"""
+### COMPANY: {company}
+### ROLE: {role}
 
+### DOCUMENT CONTENT:
+{combined_content}
+
+Return only the JSON:"""
+    
+    def _chunks_from_response(self, raw_data: Dict[str, Any], response: Optional[str]) -> List[Dict[str, Any]]:
+        """Build semantic chunks from an LLM response (fallback chunk when it failed)."""
+        all_chunks = []
+        company = raw_data["company_name"]
+        role = raw_data["role_name"]
+        primary_key = raw_data["primary_key"]
+        combined_content = raw_data["combined_text"][:12000]
+        
         try:
-            response = self.generate(prompt)
-            extracted = self._parse_json_response(response)
+            extracted = self._parse_json_response(response) if response is not None else None
             
             if extracted:
                 chunk_counter = 0
@@ -67,13 +67,8 @@ class PlacementDataExtractor:
             return None, []
         
         try:
-            # Extract facts
-            facts = self.llm_processor.extract_facts(entry)
-            
-            # Extract semantic chunks
-            chunks = self.llm_processor.extract_semantic_chunks(entry)
-            
-            return facts, chunks
+            # Extract facts and semantic chunks (one batched LLM call)
+            return self.llm_processor.extract_entry(entry)
             
         except Exception as e:
             logger.error(f"Error processing {primary_key}: {e}")
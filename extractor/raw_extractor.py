@@ -2,12 +2,16 @@
 
 import json
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from tqdm import tqdm
 
-from extractor.config import PLACEMENTS_DIR, RAW_EXTRACTED_OUTPUT, RAW_OUTPUT_DIR
+from extractor.config import (
+    PLACEMENTS_DIR, RAW_EXTRACTED_OUTPUT, RAW_OUTPUT_DIR, EXTRACTION_WORKERS
+)
 from extractor.directory_scanner import scan_placements_directory, PlacementEntry
 from extractor.file_readers import read_file
 
@@ -38,21 +42,54 @@ class RawExtraction:
     total_chars: int
 
 
+def _extract_one(file_path: Path) -> str:
+    """Read a single file (runs in a worker process; OCR loads lazily there)."""
+    return read_file(file_path)
+
+
 class RawDataExtractor:
     """Extract raw text from all placement files without LLM processing."""
     
-    def __init__(self, placements_dir: Path = PLACEMENTS_DIR):
+    def __init__(self, placements_dir: Path = PLACEMENTS_DIR, workers: int = EXTRACTION_WORKERS):
         self.placements_dir = placements_dir
+        self.workers = workers
         self.extractions: List[RawExtraction] = []
     
-    def extract_entry(self, entry: PlacementEntry) -> RawExtraction:
-        """Extract raw text from all files in an entry."""
+    def read_all_files(self, entries: List[PlacementEntry]) -> Dict[Path, str]:
+        """Read every file of every entry in parallel worker processes."""
+        files = [file_path for entry in entries for file_path in entry.files]
+        contents = {}
+        
+        # spawn, not fork: the parent may already hold a CUDA context for OCR
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as ex:
+            futures = {ex.submit(_extract_one, path): path for path in files}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Reading files"):
+                file_path = futures[future]
+                try:
+                    contents[file_path] = future.result()
+                except Exception as e:
+                    logger.error(f"Error reading {file_path}: {e}")
+        
+        return contents
+    
+    def extract_entry(
+        self,
+        entry: PlacementEntry,
+        contents: Optional[Dict[Path, str]] = None
+    ) -> RawExtraction:
+        """Extract raw text from all files in an entry (optionally pre-read)."""
         extracted_files = []
         all_text_parts = []
         
         for file_path in entry.files:
             try:
-                content = read_file(file_path)
+                if contents is None:
+                    content = read_file(file_path)
+                elif file_path in contents:
+                    content = contents[file_path]
+                else:
+                    continue  # Failed in a worker; already logged
                 if content.strip():
                     ext_file = ExtractedFile(
                         file_name=file_path.name,
@@ -85,9 +122,14 @@ class RawDataExtractor:
         entries = scan_placements_directory(self.placements_dir)
         logger.info(f"Found {len(entries)} placement entries")
         
+        contents = None
+        if self.workers > 1:
+            logger.info(f"Reading files with {self.workers} workers")
+            contents = self.read_all_files(entries)
+        
         for entry in tqdm(entries, desc="Extracting raw text"):
             try:
-                extraction = self.extract_entry(entry)
+                extraction = self.extract_entry(entry, contents)
                 self.extractions.append(extraction)
             except Exception as e:
                 logger.error(f"Error processing {entry.primary_key}: {e}")
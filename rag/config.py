@@ -15,6 +15,9 @@ SEMANTIC_FILE = OUTPUT_DIR / "semantic.json"
 FAISS_INDEX_FILE = RAG_DIR / "semantic.faiss"
 FAISS_METADATA_FILE = RAG_DIR / "semantic_metadata.json"
 FACTS_INDEX_FILE = RAG_DIR / "facts_index.pkl"
+# Built lookup indices + DataFrame, reused across runs while facts_index.pkl is
+# unchanged (None disables)
+FACTS_CACHE_FILE = RAG_DIR / "facts_index_derived.pkl"
 
 # Embedding model - good balance of speed and quality
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -24,10 +27,30 @@ EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 # Embedding settings
 EMBEDDING_DIMENSION = 384  # For MiniLM, use 768 for BGE
 EMBEDDING_BATCH_SIZE = 32
+# Token cap for the encoder (None = model default). Lower values tokenize faster
+# but truncate long chunks, so rebuild the index after changing this.
+EMBEDDING_MAX_SEQ_LENGTH = None
+# On-disk cache of text embeddings (fp16, keyed by model + text) shared across
+# runs and processes; None disables it
+EMBEDDING_CACHE_DIR = RAG_DIR / "embedding_cache"
+
+# FAISS index settings
+# IVF is only used once the corpus has enough vectors to train its centroids
+FAISS_IVF_NLIST = 64
+FAISS_IVF_MIN_VECTORS = FAISS_IVF_NLIST * 39
+FAISS_NPROBE = 8
+# Vector storage: "fp32", "fp16" (half the memory) or "sq8" (int8 scalar quantizer
+# trained on the corpus, quarter the memory)
+FAISS_VECTOR_STORAGE = "sq8"
+FAISS_USE_GPU = True  # Train IVF on GPU when faiss-gpu is installed
+FAISS_MMAP = True  # Memory-map the index on load instead of reading it into RAM
 
 # Search settings
 DEFAULT_TOP_K = 5
 SIMILARITY_THRESHOLD = 0.3
 
+# Query cache - reuse results for repeated queries (same text and filters)
+QUERY_CACHE_SIZE = 2048
+
 # Ensure directories exist
 RAG_DIR.mkdir(parents=True, exist_ok=True)
@@ -1,29 +1,68 @@
 """Structured facts index for attribute-based queries."""
 
+import asyncio
 import json
 import pickle
 import logging
+import re
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
+import numpy as np
 import pandas as pd
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_NUM_RE = re.compile(r'[\d.]+')
+# Thousands separators dropped before number matching
+_STRIP_TABLE = str.maketrans('', '', ',')
+
+# Loaded index state shared by every FactsIndex in the process, keyed by index file
+_shared_state: Dict[str, Dict[str, Any]] = {}
+
 
 class FactsIndex:
     """Structured index for facts-based queries."""
     
+    # Attributes restored from the shared state instead of re-reading the pickle
+    _SHARED_ATTRS = (
+        'facts', '_derived', 'df', '_company_index', '_role_index', '_company_trigrams',
+        '_location_index', '_branch_index', '_stipend_keys', '_stipend_ids', '_cgpa_values'
+    )
+    
+    # Bumped whenever the derived fields change, so older caches are rebuilt
+    _CACHE_FORMAT = 3
+    
+    # String fields with few distinct values, interned at load
+    _INTERNED_FIELDS = (
+        'company_name', 'role_name', 'role_title', 'employment_type', 'duration', 'work_mode'
+    )
+    
+    # DataFrame columns matched with pandas string methods
+    _STRING_COLUMNS = ('company_name', 'locations', 'branches', 'degrees', 'work_mode')
+    
     def __init__(self):
-        from rag.config import FACTS_FILE, FACTS_INDEX_FILE
+        from rag.config import FACTS_FILE, FACTS_INDEX_FILE, FACTS_CACHE_FILE
         
         self.facts_file = FACTS_FILE
         self.index_file = FACTS_INDEX_FILE
+        self.cache_file = FACTS_CACHE_FILE
         
         self.facts: List[Dict[str, Any]] = []
+        # Normalized fields per fact (parallel to facts, see _normalize_facts)
+        self._derived: List[Dict[str, Any]] = []
+        # id(fact) -> position, to find the normalized fields of a returned fact
+        self._fact_positions: Dict[int, int] = {}
         self.df: Optional[pd.DataFrame] = None
         self._company_index: Dict[str, List[int]] = {}
         self._role_index: Dict[str, List[int]] = {}
+        self._company_trigrams: Dict[str, List[str]] = {}
+        self._location_index: Dict[str, List[int]] = {}
+        self._branch_index: Dict[str, List[int]] = {}
+        self._stipend_keys = np.empty(0, dtype=np.float64)
+        self._stipend_ids = np.empty(0, dtype=np.int64)
+        self._cgpa_values: Dict[str, np.ndarray] = {}
     
     def load_facts(self, facts_file: Path = None) -> bool:
         """Load facts from JSON file."""
@@ -44,14 +83,18 @@ class FactsIndex:
     def _build_indices(self):
         """Build internal indices for fast lookup."""
         logger.info("Building indices...")
+        self._normalize_facts()
         
         # Build company index
         self._company_index = {}
         self._role_index = {}
+        self._location_index = {}
+        self._branch_index = {}
+        stipends = []
         
         for idx, fact in enumerate(self.facts):
             # Company index
-            company = fact.get('company_name', '').lower()
+            company = self._company_key(fact.get('company_name'))
             if company:
                 if company not in self._company_index:
                     self._company_index[company] = []
@@ -61,6 +104,32 @@ class FactsIndex:
             role = fact.get('primary_key', '')
             if role:
                 self._role_index[role] = idx
+            
+            # Location index
+            for location in self._location_list(fact):
+                self._location_index.setdefault(location.lower(), []).append(idx)
+            
+            # Branch index
+            elig = fact.get('eligibility', {})
+            if isinstance(elig, dict):
+                for branch in elig.get('branches', []):
+                    self._branch_index.setdefault(branch.lower(), []).append(idx)
+            
+            # Stipend amounts (sorted below for range queries)
+            amount = self._derived[idx]['stipend_amount']
+            if amount is not None:
+                stipends.append((amount, idx))
+        
+        stipends.sort()
+        self._stipend_keys = np.array([amount for amount, _ in stipends], dtype=np.float64)
+        self._stipend_ids = np.array([idx for _, idx in stipends], dtype=np.int64)
+        
+        # Trigram postings over normalized company keys for partial matching
+        self._company_trigrams = {}
+        for company in self._company_index:
+            # Keys shorter than a trigram are posted under ''
+            for gram in self._trigrams(company) or ('',):
+                self._company_trigrams.setdefault(gram, []).append(company)
         
         # Build pandas DataFrame for complex queries
         self._build_dataframe()
@@ -71,7 +140,7 @@ class FactsIndex:
         """Build pandas DataFrame for complex queries."""
         rows = []
         
-        for fact in self.facts:
+        for fact, derived in zip(self.facts, self._derived):
             row = {
                 'primary_key': fact.get('primary_key', ''),
                 'company_name': fact.get('company_name', ''),
@@ -85,11 +154,10 @@ class FactsIndex:
             
             # Extract stipend
             stipend = fact.get('stipend_salary', {})
+            row['stipend_amount'] = derived['stipend_amount']
             if isinstance(stipend, dict):
-                row['stipend_amount'] = self._parse_number(stipend.get('amount', ''))
                 row['stipend_currency'] = stipend.get('currency', 'INR')
             else:
-                row['stipend_amount'] = self._parse_number(str(stipend))
                 row['stipend_currency'] = 'INR'
             
             # Extract eligibility
@@ -104,11 +172,7 @@ class FactsIndex:
                 row['backlogs'] = elig.get('backlogs', '')
             
             # Extract location
-            locations = fact.get('location', [])
-            if isinstance(locations, list):
-                row['locations'] = ', '.join(locations)
-            else:
-                row['locations'] = str(locations)
+            row['locations'] = ', '.join(self._location_list(fact))
             
             # Selection process rounds
             selection = fact.get('selection_process', [])
@@ -117,8 +181,108 @@ class FactsIndex:
             rows.append(row)
         
         self.df = pd.DataFrame(rows)
+        
+        # CGPA cutoffs as float arrays (NaN = no requirement) for filtering
+        self._cgpa_values = {}
+        for degree in ('ug', 'pg', '10th', '12th'):
+            col = f'cgpa_{degree}'
+            if col in self.df.columns:
+                values = self.df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = np.full(len(self.df), np.nan)
+            self._cgpa_values[degree] = values
+        
+        # Arrow-backed strings vectorize .str.lower()/.str.contains() matching
+        for col in self._STRING_COLUMNS:
+            if col in self.df.columns:
+                self.df[col] = self.df[col].astype('string[pyarrow]')
+        
         logger.info(f"DataFrame built with {len(self.df)} rows")
     
+    def _normalize_facts(self):
+        """
+        Compute normalized fields for every fact (once, at load).
+        
+        They are kept apart from the facts (read them with normalized()), so
+        the facts stay as extracted and save() writes only those:
+        
+        role: role title, else role name (None if neither)
+        stipend_amount: parsed number or None
+        stipend_display: the stated amount as text, or 'N/A'
+        cgpa_required: parsed PG (else UG) CGPA cutoff or None
+        num_rounds: number of selection rounds, or None if unknown
+        
+        Also interns the low-cardinality strings (names, locations, branches)
+        so every fact, DataFrame cell and tool row shares one copy of each.
+        """
+        self._derived = []
+        for fact in self.facts:
+            self._intern_strings(fact)
+            
+            stipend = fact.get('stipend_salary', {})
+            raw = stipend.get('amount', '') if isinstance(stipend, dict) else stipend
+            elig = fact.get('eligibility', {})
+            process = fact.get('selection_process', [])
+            
+            self._derived.append({
+                'role': fact.get('role_title') or fact.get('role_name'),
+                'stipend_amount': self._extract_amount(fact),
+                'stipend_display': str(raw) if raw not in (None, '') else 'N/A',
+                'cgpa_required': (
+                    self._parse_number(elig.get('cgpa_pg') or elig.get('cgpa_ug'))
+                    if isinstance(elig, dict) else None
+                ),
+                'num_rounds': len(process) if isinstance(process, list) else None,
+            })
+        self._fact_positions = {id(f): i for i, f in enumerate(self.facts)}
+    
+    def normalized(self, fact: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalized fields (see _normalize_facts) of a fact returned by this index."""
+        return self._derived[self._fact_positions[id(fact)]]
+    
+    def _intern_strings(self, fact: Dict[str, Any]):
+        """Intern a fact's repeated string values in place (lists stay lists)."""
+        for key in self._INTERNED_FIELDS:
+            value = fact.get(key)
+            if isinstance(value, str):
+                fact[key] = sys.intern(value)
+        
+        locations = fact.get('location')
+        if isinstance(locations, list):
+            fact['location'] = [sys.intern(l) if isinstance(l, str) else l for l in locations]
+        
+        elig = fact.get('eligibility')
+        if isinstance(elig, dict):
+            for key in ('branches', 'degrees'):
+                values = elig.get(key)
+                if isinstance(values, list):
+                    elig[key] = [sys.intern(v) if isinstance(v, str) else v for v in values]
+    
+    def _extract_amount(self, fact: Dict[str, Any]) -> Optional[float]:
+        """Parse the numeric stipend amount of a fact."""
+        stipend = fact.get('stipend_salary', {})
+        if isinstance(stipend, dict):
+            return self._parse_number(stipend.get('amount', ''))
+        return self._parse_number(str(stipend))
+    
+    @staticmethod
+    def _location_list(fact: Dict[str, Any]) -> List[str]:
+        """Get the locations of a fact as a list of strings."""
+        locations = fact.get('location', [])
+        if isinstance(locations, list):
+            return locations
+        return [str(locations)]
+    
+    @staticmethod
+    def _company_key(company: Optional[str]) -> str:
+        """Normalize a company name into a company index key."""
+        return (company or '').strip().lower()
+    
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        """Get the set of character trigrams in text."""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
     def _parse_number(self, value: Any) -> Optional[float]:
         """Parse numeric value from string."""
         if value is None or value == '':
@@ -127,65 +291,150 @@ class FactsIndex:
         if isinstance(value, (int, float)):
             return float(value)
         
-        # Extract numbers from string
-        import re
-        numbers = re.findall(r'[\d.]+', str(value).replace(',', ''))
-        if numbers:
+        # Extract the first number from string
+        match = _NUM_RE.search(str(value).translate(_STRIP_TABLE))
+        if match:
             try:
-                return float(numbers[0])
-            except:
+                return float(match.group())
+            except ValueError:
                 pass
         return None
     
     def save(self):
         """Save index to disk."""
         logger.info(f"Saving facts index to {self.index_file}")
-        data = {
-            'facts': self.facts,
-            'company_index': self._company_index,
-            'role_index': self._role_index
-        }
+        # Lookup indices and the DataFrame are derived from facts on load
+        data = {'facts': self.facts}
         with open(self.index_file, 'wb') as f:
-            pickle.dump(data, f)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
     
     def load(self) -> bool:
         """Load index from disk."""
         if not self.index_file.exists():
             return self.load_facts()
         
-        logger.info(f"Loading facts index from {self.index_file}")
-        with open(self.index_file, 'rb') as f:
-            data = pickle.load(f)
+        key = str(self.index_file)
+        mtime = self.index_file.stat().st_mtime_ns
+        state = _shared_state.get(key)
+        if state is not None and state['mtime'] == mtime:
+            for attr in self._SHARED_ATTRS:
+                setattr(self, attr, state[attr])
+            self._fact_positions = state['positions']
+            logger.info(f"Reusing loaded facts index ({len(self.facts)} facts)")
+            return True
+        
+        state = self._read_cache(mtime)
+        if state is not None:
+            for attr in self._SHARED_ATTRS:
+                setattr(self, attr, state[attr])
+            # Fact identities change when unpickled, so positions aren't cached
+            self._fact_positions = {id(f): i for i, f in enumerate(self.facts)}
+            logger.info(f"Loaded built facts index from {self.cache_file}")
+        else:
+            logger.info(f"Loading facts index from {self.index_file}")
+            with open(self.index_file, 'rb') as f:
+                data = pickle.load(f)
+            
+            self.facts = data['facts']
+            self._build_indices()
+            
+            state = {attr: getattr(self, attr) for attr in self._SHARED_ATTRS}
+            state['mtime'] = mtime
+            state['format'] = self._CACHE_FORMAT
+            self._write_cache(state)
         
-        self.facts = data['facts']
-        self._company_index = data['company_index']
-        self._role_index = data['role_index']
-        self._build_dataframe()
+        state['positions'] = self._fact_positions
+        _shared_state[key] = state
         
         logger.info(f"Loaded {len(self.facts)} facts")
         return True
     
+    def _read_cache(self, mtime: int) -> Optional[Dict[str, Any]]:
+        """Read the built index state cached for this index file version."""
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        try:
+            with open(self.cache_file, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read facts index cache: {e}")
+            return None
+        if state.get('mtime') != mtime or state.get('format') != self._CACHE_FORMAT:
+            return None
+        if any(a not in state for a in self._SHARED_ATTRS):
+            return None
+        return state
+    
+    def _write_cache(self, state: Dict[str, Any]):
+        """Persist the built index state so the next run can skip building it."""
+        if self.cache_file is None:
+            return
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(self.cache_file)
+        except Exception as e:
+            logger.warning(f"Could not write facts index cache: {e}")
+    
+    async def load_async(self) -> bool:
+        """Load the index in a worker thread (to overlap with other loads)."""
+        return await asyncio.to_thread(self.load)
+    
     # =========================================================================
     # Query Methods
     # =========================================================================
     
     def get_by_company(self, company: str) -> List[Dict[str, Any]]:
         """Get all facts for a company."""
-        company_lower = company.lower()
+        company_lower = self._company_key(company)
         
         # Exact match first
         if company_lower in self._company_index:
             indices = self._company_index[company_lower]
             return [self.facts[i] for i in indices]
         
-        # Partial match
+        # Partial match - any key containing, or contained in, the query
+        # shares a trigram with it, so only those keys need the substring test
+        if len(company_lower) < 3:
+            candidates = set(self._company_index)
+        else:
+            candidates = set()
+            for gram in self._trigrams(company_lower):
+                candidates.update(self._company_trigrams.get(gram, ()))
+            candidates.update(self._company_trigrams.get('', ()))
+            if not candidates:
+                # Shares no trigram with any company: unknown name
+                return []
+        
         results = []
         for comp, indices in self._company_index.items():
-            if company_lower in comp or comp in company_lower:
+            if comp in candidates and (company_lower in comp or comp in company_lower):
                 results.extend([self.facts[i] for i in indices])
         
         return results
     
+    def get_by_companies(self, companies: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get facts for several companies in one call.
+        
+        Names are resolved once per distinct lowercased name, with the same
+        exact-then-partial matching as get_by_company. Keys of the result
+        are the names as passed in.
+        """
+        resolved: Dict[str, List[Dict[str, Any]]] = {}
+        results = {}
+        for company in companies:
+            company_lower = self._company_key(company)
+            if company_lower not in resolved:
+                indices = self._company_index.get(company_lower)
+                if indices is not None:
+                    resolved[company_lower] = [self.facts[i] for i in indices]
+                else:
+                    resolved[company_lower] = self.get_by_company(company_lower)
+            results[company] = resolved[company_lower]
+        return results
+    
     def get_by_primary_key(self, primary_key: str) -> Optional[Dict[str, Any]]:
         """Get fact by primary key."""
         if primary_key in self._role_index:
@@ -217,6 +466,10 @@ class FactsIndex:
         
         return results
     
+    def _facts_for_mask(self, mask: pd.Series) -> List[Dict[str, Any]]:
+        """Map a boolean mask over DataFrame rows back to facts (rows align with self.facts)."""
+        return [self.facts[i] for i in self.df.index[mask.to_numpy(dtype=bool, na_value=False)]]
+    
     def filter_by_stipend(
         self,
         min_amount: float = None,
@@ -226,16 +479,15 @@ class FactsIndex:
         if self.df is None:
             return []
         
-        df = self.df.copy()
+        if min_amount is None and max_amount is None:
+            return list(self.facts)
         
-        if min_amount is not None:
-            df = df[df['stipend_amount'] >= min_amount]
-        if max_amount is not None:
-            df = df[df['stipend_amount'] <= max_amount]
-        
-        # Get corresponding facts
-        primary_keys = df['primary_key'].tolist()
-        return [f for f in self.facts if f.get('primary_key', '') in primary_keys]
+        lo = 0 if min_amount is None else np.searchsorted(self._stipend_keys, min_amount, side='left')
+        hi = (
+            len(self._stipend_keys) if max_amount is None
+            else np.searchsorted(self._stipend_keys, max_amount, side='right')
+        )
+        return [self.facts[i] for i in np.sort(self._stipend_ids[lo:hi]).tolist()]
     
     def filter_by_cgpa(
         self,
@@ -246,14 +498,11 @@ class FactsIndex:
         if self.df is None:
             return []
         
-        col = f'cgpa_{degree}'
-        df = self.df.copy()
+        cgpa = self._cgpa_values[degree]
         
         # Include entries with no requirement or requirement <= max
-        df = df[(df[col].isna()) | (df[col] <= max_cgpa_required)]
-        
-        primary_keys = df['primary_key'].tolist()
-        return [f for f in self.facts if f.get('primary_key', '') in primary_keys]
+        mask = np.isnan(cgpa) | (cgpa <= max_cgpa_required)
+        return [self.facts[i] for i in np.flatnonzero(mask).tolist()]
     
     def filter_by_location(self, location: str) -> List[Dict[str, Any]]:
         """Filter companies by location."""
@@ -261,10 +510,10 @@ class FactsIndex:
             return []
         
         location_lower = location.lower()
-        df = self.df[self.df['locations'].str.lower().str.contains(location_lower, na=False)]
-        
-        primary_keys = df['primary_key'].tolist()
-        return [f for f in self.facts if f.get('primary_key', '') in primary_keys]
+        if self._spans_join(location_lower):
+            mask = self.df['locations'].str.lower().str.contains(location_lower, na=False)
+            return self._facts_for_mask(mask)
+        return self._facts_for_keys(self._location_index, location_lower)
     
     def filter_by_branch(self, branch: str) -> List[Dict[str, Any]]:
         """Filter companies by eligible branch."""
@@ -272,10 +521,27 @@ class FactsIndex:
             return []
         
         branch_lower = branch.lower()
-        df = self.df[self.df['branches'].str.lower().str.contains(branch_lower, na=False)]
-        
-        primary_keys = df['primary_key'].tolist()
-        return [f for f in self.facts if f.get('primary_key', '') in primary_keys]
+        if self._spans_join(branch_lower):
+            mask = self.df['branches'].str.lower().str.contains(branch_lower, na=False)
+            return self._facts_for_mask(mask)
+        return self._facts_for_keys(self._branch_index, branch_lower)
+    
+    @staticmethod
+    def _spans_join(query: str) -> bool:
+        """
+        Whether a substring query may match across the ', ' separator of a
+        joined DataFrame column (or match every row, if empty); such queries
+        can't be answered from the per-value indices.
+        """
+        return not query or ',' in query or query.startswith(' ')
+    
+    def _facts_for_keys(self, index: Dict[str, List[int]], query: str) -> List[Dict[str, Any]]:
+        """Facts with any indexed value containing query, in fact order."""
+        indices = set()
+        for key, key_indices in index.items():
+            if query in key:
+                indices.update(key_indices)
+        return [self.facts[i] for i in sorted(indices)]
     
     def search_attribute(
         self,
@@ -298,11 +564,10 @@ class FactsIndex:
         
         facts_to_search = self.facts
         if companies:
-            companies_lower = [c.lower() for c in companies]
-            facts_to_search = [
-                f for f in self.facts 
-                if f.get('company_name', '').lower() in companies_lower
-            ]
+            indices = {
+                i for c in companies for i in self._company_index.get(self._company_key(c), [])
+            }
+            facts_to_search = [self.facts[i] for i in sorted(indices)]
         
         attribute_map = {
             'stipend': lambda f: f.get('stipend_salary', {}),
@@ -1,49 +1,168 @@
 """FAISS-based semantic index for chunk retrieval."""
 
-import json
+import asyncio
+import hashlib
 import logging
 import numpy as np
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import faiss
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Embedding models shared by every SemanticIndex in the process, keyed by model name
+_embedder_cache: Dict[str, Any] = {}
+
+# Loaded index state shared by every SemanticIndex in the process, keyed by index file
+_shared_state: Dict[str, Dict[str, Any]] = {}
+
+# On-disk embedding caches shared by every SemanticIndex in the process, keyed by directory
+_embedding_stores: Dict[str, Any] = {}
+
+
+def _open_embedding_store(cache_dir: Optional[Path]):
+    """Open (once) the on-disk embedding cache; None if disabled or unavailable."""
+    if cache_dir is None:
+        return None
+    
+    key = str(cache_dir)
+    if key not in _embedding_stores:
+        try:
+            import diskcache
+            _embedding_stores[key] = diskcache.Cache(key)
+        except ImportError:
+            logger.warning("diskcache not installed, embedding cache disabled")
+            _embedding_stores[key] = None
+    return _embedding_stores[key]
+
 
 class SemanticIndex:
     """FAISS-based semantic search index for placement chunks."""
     
+    # Attributes restored from the shared state instead of re-reading the files
+    _SHARED_ATTRS = (
+        'index', 'metadata', '_company_to_ids', '_type_to_ids', '_company_matches',
+        'companies', 'roles', 'types', 'texts'
+    )
+    
     def __init__(self, embedding_model: str = None):
         from rag.config import (
-            EMBEDDING_MODEL, EMBEDDING_DIMENSION,
-            FAISS_INDEX_FILE, FAISS_METADATA_FILE
+            EMBEDDING_MODEL, EMBEDDING_DIMENSION, EMBEDDING_MAX_SEQ_LENGTH,
+            EMBEDDING_CACHE_DIR,
+            FAISS_INDEX_FILE, FAISS_METADATA_FILE,
+            FAISS_IVF_NLIST, FAISS_IVF_MIN_VECTORS, FAISS_NPROBE,
+            FAISS_VECTOR_STORAGE, FAISS_USE_GPU, FAISS_MMAP,
+            QUERY_CACHE_SIZE
         )
         
         self.embedding_model_name = embedding_model or EMBEDDING_MODEL
         self.embedding_dim = EMBEDDING_DIMENSION
+        self.max_seq_length = EMBEDDING_MAX_SEQ_LENGTH
+        self.embedding_cache_dir = EMBEDDING_CACHE_DIR
         self.index_file = FAISS_INDEX_FILE
         self.metadata_file = FAISS_METADATA_FILE
         
+        self.ivf_nlist = FAISS_IVF_NLIST
+        self.ivf_min_vectors = FAISS_IVF_MIN_VECTORS
+        self.nprobe = FAISS_NPROBE
+        self.vector_storage = FAISS_VECTOR_STORAGE
+        self.use_gpu = FAISS_USE_GPU
+        self.use_mmap = FAISS_MMAP
+        
         self.index: Optional[faiss.Index] = None
         self.metadata: List[Dict[str, Any]] = []
         self.embedder = None
+        self._company_to_ids: Dict[str, List[int]] = {}
+        self._type_to_ids: Dict[str, List[int]] = {}
+        # Lowercased company filter -> positions of every company containing it
+        self._company_matches: Dict[str, tuple] = {}
+        
+        # Columnar views of metadata, indexed by doc id (metadata position)
+        self.companies = np.empty(0, dtype=object)
+        self.roles = np.empty(0, dtype=object)
+        self.types = np.empty(0, dtype=object)
+        self.texts = np.empty(0, dtype=object)
+        
+        self.query_cache_size = QUERY_CACHE_SIZE
+        self._reset_query_cache()
     
     def _load_embedder(self):
         """Load the sentence transformer model."""
-        if self.embedder is None:
+        if self.embedder is not None:
+            return
+        
+        if self.embedding_model_name not in _embedder_cache:
             from sentence_transformers import SentenceTransformer
             logger.info(f"Loading embedding model: {self.embedding_model_name}")
-            self.embedder = SentenceTransformer(self.embedding_model_name)
-            # Update dimension based on actual model
-            self.embedding_dim = self.embedder.get_sentence_embedding_dimension()
-            logger.info(f"Embedding dimension: {self.embedding_dim}")
+            embedder = SentenceTransformer(self.embedding_model_name)
+            if self.max_seq_length:
+                embedder.max_seq_length = self.max_seq_length
+            _embedder_cache[self.embedding_model_name] = embedder
+        
+        self.embedder = _embedder_cache[self.embedding_model_name]
+        # Update dimension based on actual model
+        self.embedding_dim = self.embedder.get_sentence_embedding_dimension()
+        logger.info(f"Embedding dimension: {self.embedding_dim}")
+    
+    def _cached_encode(self, texts: List[str], encode) -> np.ndarray:
+        """
+        Embed texts through the on-disk cache.
+        
+        Only cache misses are passed to ``encode``; their (normalized) vectors
+        are stored as fp16 and the result is reassembled in input order.
+        """
+        store = _open_embedding_store(self.embedding_cache_dir)
+        if store is None:
+            return encode(texts)
+        
+        prefix = f"{self.embedding_model_name}|{self.max_seq_length}|"
+        keys = [hashlib.sha1((prefix + text).encode('utf-8')).hexdigest() for text in texts]
+        
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = store.get(key)
+            if cached is None:
+                misses.append(i)
+            else:
+                vectors[i] = np.frombuffer(cached, dtype=np.float16)
+        
+        if misses:
+            encoded = encode([texts[i] for i in misses]).astype(np.float16)
+            for i, vector in zip(misses, encoded):
+                store.set(keys[i], vector.tobytes())
+                vectors[i] = vector
+        
+        logger.debug(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+        return np.vstack(vectors).astype('float32')
     
     def _embed_texts(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
-        """Embed a list of texts."""
+        """Embed a list of texts (cached on disk)."""
         self._load_embedder()
-        
+        return self._cached_encode(texts, lambda misses: self._encode_texts(misses, batch_size))
+    
+    def _encode_texts(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Run the encoder over texts (no caching)."""
         logger.info(f"Embedding {len(texts)} texts...")
+        
+        import torch
+        num_gpus = torch.cuda.device_count()
+        if num_gpus > 1:
+            # Data-parallel encoding: one worker process per GPU
+            logger.info(f"Encoding across {num_gpus} GPUs")
+            pool = self.embedder.start_multi_process_pool(
+                target_devices=[f"cuda:{i}" for i in range(num_gpus)]
+            )
+            try:
+                embeddings = self.embedder.encode_multi_process(texts, pool, batch_size=batch_size)
+            finally:
+                self.embedder.stop_multi_process_pool(pool)
+            # For cosine similarity
+            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+            return embeddings.astype('float32')
+        
         embeddings = self.embedder.encode(
             texts,
             batch_size=batch_size,
@@ -62,48 +181,88 @@ class SemanticIndex:
         
         logger.info(f"Building index from {len(chunks)} chunks...")
         
-        # Extract texts for embedding
+        # Build metadata and embedding texts in one pass
+        metadata_keys = ("chunk_id", "primary_key", "company", "role", "type", "text", "source")
+        self.metadata = []
         texts = []
         for chunk in chunks:
+            meta = {key: chunk.get(key, "") for key in metadata_keys}
+            self.metadata.append(meta)
             # Create rich text for embedding (include context)
-            text = f"{chunk.get('company', '')} - {chunk.get('role', '')}: {chunk.get('type', '')}\n{chunk.get('text', '')}"
-            texts.append(text)
+            texts.append(
+                meta["company"] + " - " + meta["role"] + ": " + meta["type"] + "\n" + meta["text"]
+            )
         
         # Generate embeddings
         embeddings = self._embed_texts(texts)
         
         # Create FAISS index
-        # Using IndexFlatIP for inner product (cosine similarity with normalized vectors)
-        self.index = faiss.IndexFlatIP(self.embedding_dim)
-        
-        # Add vectors
-        self.index.add(embeddings)
+        self.index = self._create_index(embeddings)
         logger.info(f"Index built with {self.index.ntotal} vectors")
-        
-        # Store metadata
-        self.metadata = []
-        for chunk in chunks:
-            self.metadata.append({
-                "chunk_id": chunk.get("chunk_id", ""),
-                "primary_key": chunk.get("primary_key", ""),
-                "company": chunk.get("company", ""),
-                "role": chunk.get("role", ""),
-                "type": chunk.get("type", ""),
-                "text": chunk.get("text", ""),
-                "source": chunk.get("source", ""),
-            })
+        self._build_lookup()
+        self._reset_query_cache()
         
         if save:
             self.save()
     
+    def _scalar_quantizer_type(self) -> Optional[int]:
+        """Map the configured vector storage to a FAISS scalar quantizer (None = fp32)."""
+        storage_types = {
+            "fp32": None,
+            "fp16": faiss.ScalarQuantizer.QT_fp16,
+            "sq8": faiss.ScalarQuantizer.QT_8bit,
+        }
+        if self.vector_storage not in storage_types:
+            raise ValueError(f"Unknown vector storage: {self.vector_storage}")
+        return storage_types[self.vector_storage]
+    
+    def _create_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """Create and populate a FAISS index for the given embeddings."""
+        # Inner product == cosine similarity with normalized vectors
+        metric = faiss.METRIC_INNER_PRODUCT
+        sq_type = self._scalar_quantizer_type()
+        
+        if len(embeddings) < self.ivf_min_vectors:
+            if sq_type is None:
+                index = faiss.IndexFlatIP(self.embedding_dim)
+            else:
+                index = faiss.IndexScalarQuantizer(self.embedding_dim, sq_type, metric)
+                index.train(embeddings)
+            index.add(embeddings)
+            return index
+        
+        quantizer = faiss.IndexFlatIP(self.embedding_dim)
+        if sq_type is None:
+            index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, self.ivf_nlist, metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer, self.embedding_dim, self.ivf_nlist, sq_type, metric
+            )
+        
+        if self.use_gpu and hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0:
+            logger.info(f"Training IVF index ({self.ivf_nlist} lists) on GPU")
+            res = faiss.StandardGpuResources()
+            gpu_index = faiss.index_cpu_to_gpu(res, 0, index)
+            gpu_index.train(embeddings)
+            gpu_index.add(embeddings)
+            index = faiss.index_gpu_to_cpu(gpu_index)
+        else:
+            logger.info(f"Training IVF index ({self.ivf_nlist} lists) on CPU")
+            index.train(embeddings)
+            index.add(embeddings)
+        
+        index.nprobe = self.nprobe
+        return index
+    
     def save(self):
         """Save index and metadata to disk."""
         logger.info(f"Saving index to {self.index_file}")
         faiss.write_index(self.index, str(self.index_file))
         
         logger.info(f"Saving metadata to {self.metadata_file}")
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        self.metadata_file.write_bytes(
+            orjson.dumps(self.metadata, option=orjson.OPT_SERIALIZE_NUMPY)
+        )
     
     def load(self) -> bool:
         """Load index and metadata from disk."""
@@ -111,23 +270,184 @@ class SemanticIndex:
             logger.warning("Index files not found")
             return False
         
-        logger.info(f"Loading index from {self.index_file}")
-        self.index = faiss.read_index(str(self.index_file))
+        version = self._files_version()
+        if self._reuse_shared(version):
+            return True
         
-        logger.info(f"Loading metadata from {self.metadata_file}")
-        with open(self.metadata_file, 'r', encoding='utf-8') as f:
-            self.metadata = json.load(f)
+        self.index = self._read_index()
+        self.metadata = self._read_metadata()
+        self._finish_load()
+        self._share(version)
+        return True
+    
+    async def load_async(self, preload_embedder: bool = True) -> bool:
+        """
+        Load index and metadata concurrently (optionally the embedder too).
         
-        logger.info(f"Loaded index with {self.index.ntotal} vectors")
+        The reads are independent, so the load takes roughly as long as the
+        slowest of them instead of their sum.
+        """
+        if not self.index_file.exists() or not self.metadata_file.exists():
+            logger.warning("Index files not found")
+            return False
+        
+        version = self._files_version()
+        if self._reuse_shared(version):
+            if preload_embedder:
+                await asyncio.to_thread(self._load_embedder)
+            return True
+        
+        tasks = [
+            asyncio.to_thread(self._read_index),
+            asyncio.to_thread(self._read_metadata)
+        ]
+        if preload_embedder:
+            tasks.append(asyncio.to_thread(self._load_embedder))
+        
+        self.index, self.metadata, *_ = await asyncio.gather(*tasks)
+        self._finish_load()
+        self._share(version)
         return True
     
+    def _files_version(self) -> tuple:
+        return (self.index_file.stat().st_mtime_ns, self.metadata_file.stat().st_mtime_ns)
+    
+    def _reuse_shared(self, version: tuple) -> bool:
+        """Adopt the state another instance loaded from the same (unchanged) files."""
+        state = _shared_state.get(str(self.index_file))
+        if state is None or state['version'] != version:
+            return False
+        for attr in self._SHARED_ATTRS:
+            setattr(self, attr, state[attr])
+        self._reset_query_cache()
+        logger.info(f"Reusing loaded index ({self.index.ntotal} vectors)")
+        return True
+    
+    def _share(self, version: tuple):
+        state = {attr: getattr(self, attr) for attr in self._SHARED_ATTRS}
+        state['version'] = version
+        _shared_state[str(self.index_file)] = state
+    
+    def _read_index(self) -> faiss.Index:
+        logger.info(f"Loading index from {self.index_file}")
+        io_flags = 0
+        if self.use_mmap:
+            # IO_FLAG_MMAP only maps IVF inverted lists; newer FAISS versions
+            # also map flat/SQ code arrays with IO_FLAG_MMAP_IFC
+            mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+            io_flags = mmap_flag | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(str(self.index_file), io_flags)
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        return index
+    
+    def _read_metadata(self) -> List[Dict[str, Any]]:
+        logger.info(f"Loading metadata from {self.metadata_file}")
+        return orjson.loads(self.metadata_file.read_bytes())
+    
+    def _finish_load(self):
+        self._build_lookup()
+        self._reset_query_cache()
+        logger.info(f"Loaded index with {self.index.ntotal} vectors")
+    
+    def _build_lookup(self):
+        """Build company/type -> metadata position indices and metadata columns."""
+        self._company_to_ids = {}
+        self._type_to_ids = {}
+        self._company_matches = {}
+        companies, roles, types, texts = [], [], [], []
+        for i, m in enumerate(self.metadata):
+            self._company_to_ids.setdefault(m['company'].lower(), []).append(i)
+            self._type_to_ids.setdefault(m['type'], []).append(i)
+            companies.append(m['company'])
+            roles.append(m['role'])
+            types.append(m['type'])
+            texts.append(m['text'])
+        
+        n = len(self.metadata)
+        self.companies = np.fromiter(companies, dtype=object, count=n)
+        self.roles = np.fromiter(roles, dtype=object, count=n)
+        self.types = np.fromiter(types, dtype=object, count=n)
+        self.texts = np.fromiter(texts, dtype=object, count=n)
+    
+    def _ids_for_company(self, company: str) -> tuple:
+        """Get metadata positions of every company whose name contains the given one."""
+        company_lower = company.lower()
+        ids = self._company_matches.get(company_lower)
+        if ids is None:
+            ids = tuple(sorted(
+                i
+                for comp, comp_ids in self._company_to_ids.items()
+                if company_lower in comp
+                for i in comp_ids
+            ))
+            self._company_matches[company_lower] = ids
+        return ids
+    
+    def ids_for_companies(self, companies) -> np.ndarray:
+        """Get sorted metadata positions of chunks from any of the given companies (exact names)."""
+        id_lists = [self._company_to_ids.get(c.lower(), []) for c in companies]
+        if not any(id_lists):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([np.asarray(ids, dtype=np.int64) for ids in id_lists]))
+    
+    def _allowed_ids(
+        self,
+        filter_company: Optional[str] = None,
+        filter_type: Optional[str] = None,
+        allowed_doc_ids: Optional[np.ndarray] = None
+    ) -> Optional[set]:
+        """Get the set of metadata positions passing the filters (None = no filter)."""
+        allowed = None
+        if allowed_doc_ids is not None:
+            allowed = set(np.asarray(allowed_doc_ids, dtype='int64').tolist())
+        if filter_company:
+            company_ids = self._ids_for_company(filter_company)
+            allowed = set(company_ids) if allowed is None else allowed.intersection(company_ids)
+        if filter_type:
+            type_ids = self._type_to_ids.get(filter_type, [])
+            allowed = set(type_ids) if allowed is None else allowed.intersection(type_ids)
+        return allowed
+    
+    def _search_params(self, ids: set) -> faiss.SearchParameters:
+        """Build FAISS search parameters restricting results to the given ids."""
+        sel = faiss.IDSelectorBatch(np.fromiter(ids, dtype='int64', count=len(ids)))
+        if isinstance(self.index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=sel, nprobe=self.nprobe)
+        else:
+            params = faiss.SearchParameters(sel=sel)
+        # SearchParameters does not own the selector; keep it alive with params
+        params._sel = sel
+        return params
+    
+    def _reset_query_cache(self):
+        """Drop all cached query results."""
+        # (query embedding bytes, filters) -> (top_k searched, results)
+        self._query_cache: Dict[tuple, Tuple[int, List[Dict[str, Any]]]] = {}
+    
+    def _cache_lookup(self, cache_key: tuple, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """Return copies of the results cached for the same query, if any."""
+        cached = self._query_cache.get(cache_key)
+        if cached is None or cached[0] < top_k:
+            return None
+        return [dict(r) for r in cached[1][:top_k]]
+    
+    def _cache_store(self, cache_key: tuple, top_k: int, results: List[Dict[str, Any]]):
+        """Remember results for a query, evicting the oldest entry when full."""
+        if self.query_cache_size <= 0:
+            return
+        if cache_key not in self._query_cache and len(self._query_cache) >= self.query_cache_size:
+            del self._query_cache[next(iter(self._query_cache))]
+        self._query_cache[cache_key] = (top_k, [dict(r) for r in results])
+    
     def search(
         self,
         query: str,
         top_k: int = 5,
         filter_company: Optional[str] = None,
         filter_type: Optional[str] = None,
-        threshold: float = 0.0
+        threshold: float = 0.0,
+        allowed_doc_ids: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar chunks.
@@ -138,6 +458,7 @@ class SemanticIndex:
             filter_company: Filter by company name
             filter_type: Filter by chunk type
             threshold: Minimum similarity score
+            allowed_doc_ids: Restrict search to these metadata positions
         
         Returns:
             List of matching chunks with scores
@@ -147,42 +468,125 @@ class SemanticIndex:
                 logger.error("No index available")
                 return []
         
-        # Embed query
+        query_embedding = self.encode_batch([query])[0]
+        return self.search_with_embedding(
+            query_embedding,
+            top_k=top_k,
+            filter_company=filter_company,
+            filter_type=filter_type,
+            threshold=threshold,
+            allowed_doc_ids=allowed_doc_ids
+        )
+    
+    def encode_batch(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries in one encoder pass (one row per query)."""
         self._load_embedder()
-        query_embedding = self.embedder.encode(
-            [query],
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        ).astype('float32')
-        
-        # Search (get more results if filtering)
-        search_k = top_k * 5 if (filter_company or filter_type) else top_k
-        scores, indices = self.index.search(query_embedding, min(search_k, self.index.ntotal))
-        
-        # Collect results with filtering
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < 0 or score < threshold:
-                continue
-            
-            meta = self.metadata[idx]
-            
-            # Apply filters
-            if filter_company and filter_company.lower() not in meta['company'].lower():
-                continue
-            if filter_type and filter_type != meta['type']:
-                continue
-            
-            results.append({
-                **meta,
-                "score": float(score)
-            })
-            
-            if len(results) >= top_k:
-                break
+        # The tokenizer splits on whitespace, so queries differing only in
+        # spacing embed identically; collapse it so they share a cache entry
+        return self._cached_encode(
+            [' '.join(q.split()) for q in queries],
+            lambda misses: self.embedder.encode(
+                misses,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        )
+    
+    def search_with_embedding(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        filter_company: Optional[str] = None,
+        filter_type: Optional[str] = None,
+        threshold: float = 0.0,
+        allowed_doc_ids: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for similar chunks using a precomputed query embedding (see encode_batch)."""
+        if self.index is None:
+            if not self.load():
+                logger.error("No index available")
+                return []
+        
+        query_embedding = query_embedding.reshape(1, -1)
+        
+        # Arbitrary id subsets are not worth keying the query cache on. The
+        # embedding stands in for the query text: encode_batch caches it per
+        # (whitespace-normalized) text, so a repeated query yields the same
+        # bytes, while a merely similar one (e.g. another company) does not
+        use_cache = allowed_doc_ids is None
+        cache_key = (
+            query_embedding.tobytes(),
+            filter_company.lower() if filter_company else None,
+            filter_type,
+            threshold
+        )
+        if use_cache:
+            cached = self._cache_lookup(cache_key, top_k)
+            if cached is not None:
+                return cached
+        
+        ids, scores = self.search_ids(
+            query_embedding,
+            top_k=top_k,
+            filter_company=filter_company,
+            filter_type=filter_type,
+            threshold=threshold,
+            allowed_doc_ids=allowed_doc_ids
+        )
+        results = [self.record(idx, score) for idx, score in zip(ids.tolist(), scores.tolist())]
         
+        if use_cache:
+            self._cache_store(cache_key, top_k, results)
         return results
     
+    def search_ids(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        filter_company: Optional[str] = None,
+        filter_type: Optional[str] = None,
+        threshold: float = 0.0,
+        allowed_doc_ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search without building result records.
+        
+        Returns:
+            (doc ids, scores) sorted by score; read fields through the
+            metadata columns (e.g. ``self.companies[ids]``) or ``record()``
+        """
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.index is None:
+            if not self.load():
+                logger.error("No index available")
+                return empty
+        
+        query_embedding = query_embedding.reshape(1, -1)
+        
+        allowed = self._allowed_ids(filter_company, filter_type, allowed_doc_ids)
+        if allowed is not None and not allowed:
+            return empty
+        
+        # Restrict the search to allowed ids inside FAISS instead of post-filtering
+        params = None
+        search_k = top_k
+        if allowed is not None:
+            params = self._search_params(allowed)
+            search_k = min(top_k, len(allowed))
+        scores, indices = self.index.search(
+            query_embedding, min(search_k, self.index.ntotal), params=params
+        )
+        
+        keep = (indices[0] >= 0) & (scores[0] >= threshold)
+        return indices[0][keep][:top_k], scores[0][keep][:top_k]
+    
+    def record(self, doc_id: int, score: Optional[float] = None) -> Dict[str, Any]:
+        """Materialize the result dict for a doc id."""
+        result = dict(self.metadata[doc_id])
+        if score is not None:
+            result["score"] = float(score)
+        return result
+    
     def search_by_type(
         self,
         query: str,
@@ -203,22 +607,19 @@ class SemanticIndex:
     
     def get_all_by_company(self, company: str) -> List[Dict[str, Any]]:
         """Get all chunks for a company."""
-        return [m for m in self.metadata if company.lower() in m['company'].lower()]
+        return [self.metadata[i] for i in self._ids_for_company(company)]
     
     def get_all_by_type(self, chunk_type: str) -> List[Dict[str, Any]]:
         """Get all chunks of a specific type."""
-        return [m for m in self.metadata if m['type'] == chunk_type]
+        return [self.metadata[i] for i in self._type_to_ids.get(chunk_type, [])]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics."""
         if not self.metadata:
             return {}
         
-        companies = set(m['company'] for m in self.metadata)
-        types = {}
-        for m in self.metadata:
-            t = m['type']
-            types[t] = types.get(t, 0) + 1
+        companies = set(self.companies.tolist())
+        types = {t: len(ids) for t, ids in self._type_to_ids.items()}
         
         return {
             "total_chunks": len(self.metadata),
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Test retrieval quality from both indices."""
 
+import asyncio
+import io
 import sys
 import os
+from contextlib import redirect_stdout
+from functools import lru_cache, wraps
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -10,14 +14,51 @@ from rag.semantic_index import SemanticIndex
 from rag.facts_index import FactsIndex
 
 
-def test_semantic_search():
+@lru_cache(maxsize=1)
+def _get_semantic():
+    """Load the semantic index once per process (None if unavailable)."""
+    index = SemanticIndex()
+    return index if index.load() else None
+
+
+@lru_cache(maxsize=1)
+def _get_facts():
+    """Load the facts index once per process (None if unavailable)."""
+    index = FactsIndex()
+    return index if index.load() else None
+
+
+def _buffered(func):
+    """Collect a test's printed report and write it to stdout in one go."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+
+async def _load_all():
+    """Load both indices concurrently."""
+    semantic = SemanticIndex()
+    facts = FactsIndex()
+    semantic_ok, facts_ok = await asyncio.gather(semantic.load_async(), facts.load_async())
+    return (semantic if semantic_ok else None), (facts if facts_ok else None)
+
+
+@_buffered
+def test_semantic_search(index=None):
     """Test semantic search functionality."""
     print("\n" + "=" * 70)
     print("TESTING SEMANTIC SEARCH")
     print("=" * 70)
     
-    index = SemanticIndex()
-    if not index.load():
+    index = index or _get_semantic()
+    if index is None:
         print("❌ Failed to load semantic index. Run build_index.py first.")
         return
     
@@ -30,15 +71,18 @@ def test_semantic_search():
         ("Dell technologies", "Dell", None),
     ]
     
-    for query, company_filter, type_filter in test_queries:
+    # Encode all queries in a single batch
+    embeddings = index.encode_batch([q for q, _, _ in test_queries])
+    
+    for (query, company_filter, type_filter), embedding in zip(test_queries, embeddings):
         print(f"\n🔍 Query: '{query}'")
         if company_filter:
             print(f"   Filter: company={company_filter}")
         if type_filter:
             print(f"   Filter: type={type_filter}")
         
-        results = index.search(
-            query,
+        results = index.search_with_embedding(
+            embedding,
             top_k=3,
             filter_company=company_filter,
             filter_type=type_filter
@@ -51,14 +95,15 @@ def test_semantic_search():
             print(f"       Text: {r['text'][:150]}...")
 
 
-def test_facts_queries():
+@_buffered
+def test_facts_queries(index=None):
     """Test facts-based queries."""
     print("\n" + "=" * 70)
     print("TESTING FACTS QUERIES")
     print("=" * 70)
     
-    index = FactsIndex()
-    if not index.load():
+    index = index or _get_facts()
+    if index is None:
         print("❌ Failed to load facts index. Run build_index.py first.")
         return
     
@@ -77,12 +122,7 @@ def test_facts_queries():
     print("\n💰 Companies with stipend > 40000:")
     high_stipend = index.filter_by_stipend(min_amount=40000)
     for f in high_stipend[:5]:
-        stipend = f.get('stipend_salary', {})
-        if isinstance(stipend, dict):
-            amt = stipend.get('amount', 'N/A')
-        else:
-            amt = stipend
-        print(f"   {f['company_name']}: {amt}")
+        print(f"   {f['company_name']}: {index.normalized(f)['stipend_display']}")
     
     # Test 4: Filter by location
     print("\n📍 Companies in Bangalore:")
@@ -107,46 +147,41 @@ def test_facts_queries():
             print(f"   {p['company']}: {len(rounds)} rounds")
 
 
-def test_combined_queries():
+@_buffered
+def test_combined_queries(semantic=None, facts=None):
     """Test queries that need both indices."""
     print("\n" + "=" * 70)
     print("TESTING COMBINED QUERIES")
     print("=" * 70)
     
-    semantic = SemanticIndex()
-    facts = FactsIndex()
-    
-    semantic.load()
-    facts.load()
+    semantic = semantic or _get_semantic()
+    facts = facts or _get_facts()
+    if semantic is None or facts is None:
+        print("❌ Failed to load indices. Run build_index.py first.")
+        return
     
     # Query: Companies with high stipend that need Python
     print("\n🔍 Query: 'Companies with stipend > 40000 that need Python'")
     
     # Step 1: Get high stipend companies from facts
     high_stipend = facts.filter_by_stipend(min_amount=40000)
-    high_stipend_companies = set(f['company_name'] for f in high_stipend)
+    company_to_stipend = {}
+    for f in high_stipend:
+        company_to_stipend.setdefault(f['company_name'], facts.normalized(f)['stipend_display'])
+    high_stipend_companies = company_to_stipend.keys()
     print(f"   Step 1: {len(high_stipend_companies)} companies with high stipend")
     
-    # Step 2: Search for Python skills in those companies
+    # Step 2: Search for Python skills, restricted to chunks of those companies
     print(f"   Step 2: Searching for Python skills...")
-    python_results = semantic.search("Python programming skills required", top_k=20)
-    
-    # Step 3: Intersection
-    matching = []
-    for r in python_results:
-        if r['company'] in high_stipend_companies:
-            matching.append(r)
-    
-    print(f"\n   ✅ Found {len(matching)} matching companies:")
-    for m in matching[:5]:
-        company_facts = facts.get_by_company(m['company'])
-        stipend = "N/A"
-        if company_facts:
-            s = company_facts[0].get('stipend_salary', {})
-            if isinstance(s, dict):
-                stipend = s.get('amount', 'N/A')
-        print(f"      - {m['company']} (Stipend: {stipend})")
-        print(f"        Skills: {m['text'][:100]}...")
+    allowed = semantic.ids_for_companies(high_stipend_companies)
+    query_embedding = semantic.encode_batch(["Python programming skills required"])[0]
+    doc_ids, _ = semantic.search_ids(query_embedding, top_k=5, allowed_doc_ids=allowed)
+    
+    print(f"\n   ✅ Found {len(doc_ids)} matching companies:")
+    for company, text in zip(semantic.companies[doc_ids], semantic.texts[doc_ids]):
+        stipend = company_to_stipend.get(company, 'N/A')
+        print(f"      - {company} (Stipend: {stipend})")
+        print(f"        Skills: {text[:100]}...")
 
 
 def main():
@@ -155,9 +190,11 @@ def main():
     print("RAG RETRIEVAL QUALITY TEST")
     print("=" * 70)
     
-    test_semantic_search()
-    test_facts_queries()
-    test_combined_queries()
+    semantic, facts = asyncio.run(_load_all())
+    
+    test_semantic_search(semantic)
+    test_facts_queries(facts)
+    test_combined_queries(semantic, facts)
     
     print("\n" + "=" * 70)
     print("TESTING COMPLETE")
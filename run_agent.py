@@ -5,9 +5,14 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-os.environ["CUDA_VISIBLE_DEVICES"] = "1"  # Use second GPU
+from tools.gpu_init import select_gpu
+select_gpu(1)  # Use second GPU
 
 from agent.orchestrator import create_agent
+from agent.cache import ResponseCache
+from agent.critic import confidence_level
+
+CONFIDENCE_ICONS = ("🔴", "🟡", "🟢")
 
 
 def main():
@@ -28,6 +33,7 @@ def main():
     
     use_llm = True
     agent = create_agent(use_llm=use_llm)
+    cache = ResponseCache(retrieve_companies=agent.retrieved_companies)
     
     companies = agent.get_companies()
     print(f"✅ Ready! {len(companies)} companies loaded.")
@@ -60,24 +66,35 @@ def main():
             
             if query.lower() == 'nollm':
                 use_llm = not use_llm
-                agent = create_agent(use_llm=use_llm)
+                agent.set_use_llm(use_llm)
                 print(f"🤖 LLM mode: {'ON' if use_llm else 'OFF (rule-based)'}\n")
                 continue
             
-            # Process query
-            response = agent.query(query, verbose=verbose)
-            
-            print("\n" + "─" * 60)
-            print(response.answer)
-            print("─" * 60)
+            # Process query (cached answers skip planning and the LLM)
+            response = cache.get(query, use_llm)
+            if response is None:
+                response = agent.query(query, verbose=verbose)
+                cache.put(query, use_llm, response)
+            elif verbose:
+                print("⚡ Cached response")
             
             conf = response.feedback.confidence_score
-            conf_icon = "🟢" if conf > 0.7 else "🟡" if conf > 0.4 else "🔴"
-            print(f"{conf_icon} Confidence: {conf:.0%}")
+            conf_icon = CONFIDENCE_ICONS[confidence_level(conf)]
             
+            lines = [
+                "",
+                "─" * 60,
+                response.answer,
+                "─" * 60,
+                f"{conf_icon} Confidence: {conf:.0%}"
+            ]
             if response.retries > 0:
-                print(f"🔄 Retries: {response.retries}")
-            print()
+                lines.append(f"🔄 Retries: {response.retries}")
+            lines.append("")
+            
+            # One write for the whole answer block
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
             
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye! Good luck with your placements! 🎉")
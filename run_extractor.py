@@ -7,7 +7,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Set GPU before importing torch
-os.environ["CUDA_VISIBLE_DEVICES"] = "1"  # Use second A100
+from tools.gpu_init import select_gpu
+select_gpu(1)  # Use second A100
 
 from extractor.main_extractor import main
 
@@ -5,7 +5,26 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-os.environ["CUDA_VISIBLE_DEVICES"] = "1"
+from tools.gpu_init import select_gpu
+select_gpu(1)
+
+async def stream_response(processor, prompt: str):
+    """Print the response as it streams; return (text, time to first token)."""
+    import time
+    
+    print("\nResponse:")
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    async for delta in processor.generate_stream(prompt):
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        parts.append(delta)
+        sys.stdout.write(delta)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    return "".join(parts), ttft
+
 
 def main():
     print("=" * 60)
@@ -31,7 +50,7 @@ def main():
     
     try:
         from extractor.llm_processor import LLMProcessor
-        processor = LLMProcessor()
+        processor = LLMProcessor(streaming=USE_VLLM)
         
         # Test generation
         print("\n✅ Model loaded successfully!")
@@ -43,8 +62,21 @@ def main():
 
 Return JSON: {"company": "...", "job_title": "..."}"""
         
-        response = processor.generate(test_prompt)
-        print(f"\nResponse:\n{response}")
+        response, ttft = processor.run_async(stream_response(processor, test_prompt))
+        if ttft is not None:
+            print(f"\nTime to first token: {ttft:.2f}s")
+        
+        # Prefix caching: the second prompt shares a long prefix with the first
+        if USE_VLLM:
+            import time
+            print("\nTesting prefix caching...")
+            preamble = "You are an expert data extraction assistant.\n" + "Placement notice text. " * 200
+            timings = []
+            for tail in ["Company: Amazon", "Company: Dell"]:
+                start = time.time()
+                processor.generate(f"{preamble}\n{tail}\nReturn the company name:")
+                timings.append(time.time() - start)
+            print(f"   Cold prefix: {timings[0]:.2f}s | Cached prefix: {timings[1]:.2f}s")
         
         print("\n" + "=" * 60)
         print("✅ LLM TEST PASSED - Ready for extraction!")
@@ -1,5 +1,7 @@
 """Tools package for placement RAG agent."""
 
+import asyncio
+
 from tools.facts_tool import FactsLookupTool
 from tools.semantic_tool import SemanticRAGTool
 from tools.compare_tool import CompareCompaniesTool
@@ -9,5 +11,28 @@ __all__ = [
     'BaseTool',
     'FactsLookupTool',
     'SemanticRAGTool',
-    'CompareCompaniesTool'
+    'CompareCompaniesTool',
+    'warm_up'
 ]
+
+
+def warm_up() -> bool:
+    """
+    Load the facts index, semantic index and embedding model concurrently.
+    
+    Loaded indices and models are shared per process, so tools created
+    afterwards reuse them instead of loading on their first query.
+    """
+    from rag.facts_index import FactsIndex
+    from rag.semantic_index import SemanticIndex
+    
+    async def load_all():
+        return await asyncio.gather(FactsIndex().load_async(), SemanticIndex().load_async())
+    
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return all(asyncio.run(load_all()))
+    
+    # Already inside an event loop (e.g. a notebook); load one after another
+    return FactsIndex().load() and SemanticIndex().load()
@@ -4,8 +4,10 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 from dataclasses import dataclass
 
+import orjson
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolResult:
     """Result from a tool execution."""
     success: bool
@@ -23,6 +25,14 @@ class ToolResult:
             "query": self.query
         }
     
+    def to_json(self) -> str:
+        """Serialize the result (e.g. for an LLM prompt or a web response)."""
+        return orjson.dumps(
+            self.to_dict(),
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            default=str
+        ).decode()
+    
     def __str__(self) -> str:
         if self.success:
             return f"[{self.tool_name}] ✅ {self.message}\nData: {self.data}"
@@ -46,12 +56,17 @@ class BaseTool(ABC):
         pass
     
     def get_schema(self) -> Dict[str, Any]:
-        """Return the tool schema for LLM."""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": self._get_parameters()
-        }
+        """Return the tool schema for LLM (built once per tool class)."""
+        cls = type(self)
+        schema = cls.__dict__.get('_schema')
+        if schema is None:
+            schema = {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self._get_parameters()
+            }
+            cls._schema = schema
+        return schema
     
     @abstractmethod
     def _get_parameters(self) -> Dict[str, Any]:
@@ -4,12 +4,95 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
 from tools.base_tool import BaseTool, ToolResult
 from rag.facts_index import FactsIndex
 from rag.semantic_index import SemanticIndex
 
 
+def _extract_stipend(fact: Dict[str, Any]) -> Any:
+    stipend = fact.get("stipend_salary", {})
+    if isinstance(stipend, dict):
+        return stipend.get("amount", "N/A")
+    return str(stipend) if stipend else "N/A"
+
+
+def _extract_cgpa(fact: Dict[str, Any]) -> Any:
+    elig = fact.get("eligibility", {})
+    if isinstance(elig, dict):
+        return elig.get("cgpa_pg") or elig.get("cgpa_ug", "N/A")
+    return "N/A"
+
+
+def _extract_location(fact: Dict[str, Any]) -> Any:
+    loc = fact.get("location", [])
+    if isinstance(loc, list):
+        return ", ".join(loc) if loc else "N/A"
+    return str(loc) if loc else "N/A"
+
+
+def _extract_rounds(fact: Dict[str, Any]) -> Any:
+    process = fact.get("selection_process", [])
+    return len(process) if isinstance(process, list) else "N/A"
+
+
+# Table cell extractors by attribute; other attributes are read as-is
+_ATTR_EXTRACTORS = {
+    "stipend": _extract_stipend,
+    "cgpa": _extract_cgpa,
+    "location": _extract_location,
+    "num_rounds": _extract_rounds,
+}
+
+
+def _score_stipend(stipend, cgpa, rounds, details: Dict[str, Any]) -> float:
+    if not stipend:
+        return 0
+    details["stipend"] = stipend
+    return stipend / 10000  # Normalize
+
+
+def _score_low_cgpa(stipend, cgpa, rounds, details: Dict[str, Any]) -> float:
+    if not cgpa:
+        return 0
+    details["cgpa"] = cgpa
+    return 10 - cgpa  # Lower is better
+
+
+def _score_few_rounds(stipend, cgpa, rounds, details: Dict[str, Any]) -> float:
+    if not rounds:
+        return 0
+    details["rounds"] = rounds
+    return 10 - rounds  # Fewer is better
+
+
+# Best-company criteria -> scorer(stipend, cgpa, rounds, details)
+_CRIT_SCORE = {
+    "stipend": _score_stipend,
+    "low_cgpa": _score_low_cgpa,
+    "few_rounds": _score_few_rounds,
+}
+
+# Ranking attribute -> normalized fact field (FactsIndex.normalized)
+_RANK_FIELDS = {
+    "stipend": "stipend_amount",
+    "cgpa": "cgpa_required",
+    "rounds": "num_rounds",
+    "num_rounds": "num_rounds",
+}
+
+# Detailed comparison slots filled from semantic chunks, by chunk type
+_CHUNK_SLOTS = {
+    "about_company": "about",
+    "skills_required": "skills_required",
+    "interview_process": "interview_process",
+}
+
+
 class CompareCompaniesTool(BaseTool):
     """
     Tool for comparing multiple companies on various attributes.
@@ -37,8 +120,34 @@ class CompareCompaniesTool(BaseTool):
         if not self._loaded:
             self.facts_index.load()
             self.semantic_index.load()
+            # Lookups are pure for loaded indices; memoize per lowercased name
+            self._facts_cache: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+            self._chunks_by_company = lru_cache(maxsize=1024)(
+                lambda name: tuple(self.semantic_index.get_all_by_company(name))
+            )
             self._loaded = True
     
+    def _get_facts_for(self, companies: List[str]) -> Dict[str, Tuple[Dict[str, Any], ...]]:
+        """Facts for several companies, fetching all cache misses in one batch."""
+        keys = [c.strip().lower() for c in companies]
+        fetched = {}
+        misses = [k for k in keys if k not in self._facts_cache]
+        if misses:
+            for name, facts in self.facts_index.get_by_companies(misses).items():
+                fetched[name] = tuple(facts)
+        result = {c: fetched[k] if k in fetched else self._facts_cache[k]
+                  for c, k in zip(companies, keys)}
+        if fetched:
+            # Evict only after the result is built so earlier hits stay valid
+            if len(self._facts_cache) + len(fetched) > 1024:
+                self._facts_cache.clear()
+            self._facts_cache.update(fetched)
+        return result
+    
+    def _get_chunks(self, company: str) -> Tuple[Dict[str, Any], ...]:
+        """Semantic chunks for a company (memoized)."""
+        return self._chunks_by_company(company.lower())
+    
     def _get_parameters(self) -> Dict[str, Any]:
         return {
             "type": "object",
@@ -78,6 +187,15 @@ class CompareCompaniesTool(BaseTool):
             "Detailed side-by-side comparison"
         ]
     
+    # comparison_type -> handler(self, companies, attributes, rank_by, key), where
+    # key is the comma-joined company list; unknown types fall back to the table
+    _DISPATCH = {
+        "table": lambda self, companies, attributes, rank_by, key: self._compare_table(companies, attributes, key),
+        "detailed": lambda self, companies, attributes, rank_by, key: self._compare_detailed(companies, key),
+        "ranking": lambda self, companies, attributes, rank_by, key: self._compare_ranking(companies, rank_by),
+        "best_for": lambda self, companies, attributes, rank_by, key: self._find_best(companies, attributes),
+    }
+    
     def execute(
         self,
         companies: List[str],
@@ -88,7 +206,16 @@ class CompareCompaniesTool(BaseTool):
     ) -> ToolResult:
         """Execute a company comparison."""
         
-        self._ensure_loaded()
+        # Warm instances skip the loader call entirely
+        if not self._loaded:
+            self._ensure_loaded()
+        
+        # Drop repeated names (same index key), keeping the first spelling
+        if companies:
+            unique = {}
+            for company in companies:
+                unique.setdefault(company.strip().lower(), company)
+            companies = list(unique.values())
         
         if not companies or len(companies) < 2:
             return ToolResult(
@@ -100,16 +227,8 @@ class CompareCompaniesTool(BaseTool):
             )
         
         try:
-            if comparison_type == "table":
-                return self._compare_table(companies, attributes)
-            elif comparison_type == "detailed":
-                return self._compare_detailed(companies)
-            elif comparison_type == "ranking":
-                return self._compare_ranking(companies, rank_by)
-            elif comparison_type == "best_for":
-                return self._find_best(companies, attributes)
-            else:
-                return self._compare_table(companies, attributes)
+            handler = self._DISPATCH.get(comparison_type, self._DISPATCH["table"])
+            return handler(self, companies, attributes, rank_by, ','.join(companies))
                 
         except Exception as e:
             return ToolResult(
@@ -120,7 +239,12 @@ class CompareCompaniesTool(BaseTool):
                 query=str(companies)
             )
     
-    def _compare_table(self, companies: List[str], attributes: List[str] = None) -> ToolResult:
+    def _compare_table(
+        self,
+        companies: List[str],
+        attributes: List[str] = None,
+        companies_key: str = None
+    ) -> ToolResult:
         """Generate comparison table."""
         
         if attributes is None:
@@ -128,9 +252,10 @@ class CompareCompaniesTool(BaseTool):
         
         comparison = {}
         found_companies = []
+        facts_by_company = self._get_facts_for(companies)
         
         for company in companies:
-            facts = self.facts_index.get_by_company(company)
+            facts = facts_by_company[company]
             if not facts:
                 continue
             
@@ -140,46 +265,25 @@ class CompareCompaniesTool(BaseTool):
             fact = facts[0]
             
             company_data = {
-                "role": fact.get("role_title") or fact.get("role_name", "N/A")
+                "role": self.facts_index.normalized(fact)["role"] or "N/A"
             }
             
             for attr in attributes:
-                if attr == "stipend":
-                    stipend = fact.get("stipend_salary", {})
-                    if isinstance(stipend, dict):
-                        company_data[attr] = stipend.get("amount", "N/A")
-                    else:
-                        company_data[attr] = str(stipend) if stipend else "N/A"
-                
-                elif attr == "cgpa":
-                    elig = fact.get("eligibility", {})
-                    if isinstance(elig, dict):
-                        company_data[attr] = elig.get("cgpa_pg") or elig.get("cgpa_ug", "N/A")
-                    else:
-                        company_data[attr] = "N/A"
-                
-                elif attr == "location":
-                    loc = fact.get("location", [])
-                    if isinstance(loc, list):
-                        company_data[attr] = ", ".join(loc) if loc else "N/A"
-                    else:
-                        company_data[attr] = str(loc) if loc else "N/A"
-                
-                elif attr == "num_rounds":
-                    process = fact.get("selection_process", [])
-                    company_data[attr] = len(process) if isinstance(process, list) else "N/A"
-                
-                elif attr == "duration":
-                    company_data[attr] = fact.get("duration", "N/A")
-                
-                elif attr == "work_mode":
-                    company_data[attr] = fact.get("work_mode", "N/A")
-                
-                else:
-                    company_data[attr] = fact.get(attr, "N/A")
+                extractor = _ATTR_EXTRACTORS.get(attr)
+                company_data[attr] = extractor(fact) if extractor else fact.get(attr, "N/A")
             
             comparison[company] = company_data
         
+        companies_key = companies_key or ','.join(companies)
+        if not comparison:
+            return ToolResult(
+                success=False,
+                data=None,
+                message="No matching companies found",
+                tool_name=self.name,
+                query=f"compare:{companies_key}"
+            )
+        
         # Format as table string
         table_str = self._format_table(comparison, attributes)
         
@@ -193,7 +297,7 @@ class CompareCompaniesTool(BaseTool):
             },
             message=f"Compared {len(found_companies)} companies on {len(attributes)} attributes",
             tool_name=self.name,
-            query=f"compare:{','.join(companies)}"
+            query=f"compare:{companies_key}"
         )
     
     def _format_table(self, comparison: Dict, attributes: List[str]) -> str:
@@ -202,49 +306,49 @@ class CompareCompaniesTool(BaseTool):
             return "No data to compare"
         
         # Headers
-        companies = list(comparison.keys())
-        header = ["Attribute"] + companies
+        header = ["Attribute", *comparison]
+        records = list(comparison.values())
         
-        # Rows
+        # Rows (every cell stringified exactly once)
         rows = []
-        rows.append(["Role"] + [comparison[c].get("role", "N/A") for c in companies])
+        rows.append(["Role"] + [str(data.get("role", "N/A")) for data in records])
         
         for attr in attributes:
             row = [attr.replace("_", " ").title()]
-            for company in companies:
-                val = comparison[company].get(attr, "N/A")
+            for data in records:
+                val = data.get(attr, "N/A")
                 row.append(str(val) if val else "N/A")
             rows.append(row)
         
-        # Calculate column widths
-        widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+        # Calculate column widths in one pass over the cells
+        widths = [len(h) for h in header]
+        for row in rows:
+            for i, cell in enumerate(row):
+                if len(cell) > widths[i]:
+                    widths[i] = len(cell)
         
-        # Build table
-        lines = []
+        # Build table from a separator and row template built once
         separator = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+        row_fmt = "| " + " | ".join(f"{{:<{w}}}" for w in widths) + " |"
         
-        lines.append(separator)
-        lines.append("|" + "|".join(f" {header[i]:<{widths[i]}} " for i in range(len(header))) + "|")
-        lines.append(separator)
-        
-        for row in rows:
-            lines.append("|" + "|".join(f" {str(row[i]):<{widths[i]}} " for i in range(len(row))) + "|")
-        
+        lines = [separator, row_fmt.format(*header), separator]
+        lines.extend(row_fmt.format(*row) for row in rows)
         lines.append(separator)
         
         return "\n".join(lines)
     
-    def _compare_detailed(self, companies: List[str]) -> ToolResult:
+    def _compare_detailed(self, companies: List[str], companies_key: str = None) -> ToolResult:
         """Generate detailed comparison with semantic info."""
         
         detailed = {}
+        facts_by_company = self._get_facts_for(companies)
         
         for company in companies:
             # Get facts
-            facts = self.facts_index.get_by_company(company)
+            facts = facts_by_company[company]
             
             # Get semantic chunks
-            chunks = self.semantic_index.get_all_by_company(company)
+            chunks = self._get_chunks(company)
             
             if not facts and not chunks:
                 continue
@@ -260,27 +364,35 @@ class CompareCompaniesTool(BaseTool):
             if facts:
                 f = facts[0]
                 company_info["facts"] = {
-                    "role": f.get("role_title") or f.get("role_name"),
+                    "role": self.facts_index.normalized(f)["role"],
                     "stipend": f.get("stipend_salary"),
                     "location": f.get("location"),
                     "eligibility": f.get("eligibility"),
                     "selection_process": f.get("selection_process")
                 }
             
-            # Extract semantic info
+            # Extract semantic info (first non-empty chunk per slot)
             for chunk in chunks:
-                chunk_type = chunk.get("type", "")
-                text = chunk.get("text", "")
+                slot = _CHUNK_SLOTS.get(chunk.get("type", ""))
+                if slot is None or company_info[slot]:
+                    continue
                 
-                if chunk_type == "about_company" and not company_info["about"]:
-                    company_info["about"] = text[:500]
-                elif chunk_type == "skills_required" and not company_info["skills_required"]:
-                    company_info["skills_required"] = text[:500]
-                elif chunk_type == "interview_process" and not company_info["interview_process"]:
-                    company_info["interview_process"] = text[:500]
+                company_info[slot] = chunk.get("text", "")[:500]
+                if all(company_info[s] for s in _CHUNK_SLOTS.values()):
+                    break
             
             detailed[company] = company_info
         
+        companies_key = companies_key or ','.join(companies)
+        if not detailed:
+            return ToolResult(
+                success=False,
+                data=None,
+                message="No matching companies found",
+                tool_name=self.name,
+                query=f"detailed:{companies_key}"
+            )
+        
         return ToolResult(
             success=True,
             data={
@@ -289,48 +401,37 @@ class CompareCompaniesTool(BaseTool):
             },
             message=f"Generated detailed comparison for {len(detailed)} companies",
             tool_name=self.name,
-            query=f"detailed:{','.join(companies)}"
+            query=f"detailed:{companies_key}"
         )
     
     def _compare_ranking(self, companies: List[str], rank_by: str = "stipend") -> ToolResult:
         """Rank companies by specific attribute."""
         
         rankings = []
+        facts_by_company = self._get_facts_for(companies)
+        field = _RANK_FIELDS.get(rank_by)
         
         for company in companies:
-            facts = self.facts_index.get_by_company(company)
-            if not facts:
+            facts = facts_by_company[company]
+            if not facts or field is None:
                 continue
             
-            fact = facts[0]
-            value = None
-            
-            if rank_by == "stipend":
-                stipend = fact.get("stipend_salary", {})
-                if isinstance(stipend, dict):
-                    value = self._parse_number(stipend.get("amount"))
-                else:
-                    value = self._parse_number(stipend)
-            
-            elif rank_by == "cgpa":
-                elig = fact.get("eligibility", {})
-                if isinstance(elig, dict):
-                    value = self._parse_number(elig.get("cgpa_pg") or elig.get("cgpa_ug"))
-            
-            elif rank_by == "rounds" or rank_by == "num_rounds":
-                process = fact.get("selection_process", [])
-                value = len(process) if isinstance(process, list) else None
+            normalized = self.facts_index.normalized(facts[0])
+            value = normalized[field]
             
             if value is not None:
                 rankings.append({
                     "company": company,
-                    "role": fact.get("role_title") or fact.get("role_name"),
+                    "role": normalized["role"],
                     rank_by: value
                 })
         
-        # Sort (descending for stipend, ascending for cgpa/rounds)
+        # Sort (descending for stipend, ascending for cgpa/rounds); a stable
+        # argsort keeps ties in input order
         reverse = rank_by == "stipend"
-        rankings.sort(key=lambda x: x.get(rank_by, 0) or 0, reverse=reverse)
+        values = np.fromiter((r[rank_by] for r in rankings), dtype=np.float64, count=len(rankings))
+        order = np.argsort(-values if reverse else values, kind="stable")
+        rankings = [rankings[i] for i in order]
         
         # Add rank
         for i, r in enumerate(rankings, 1):
@@ -355,75 +456,38 @@ class CompareCompaniesTool(BaseTool):
             criteria = ["stipend"]
         
         scores = {}
+        facts_by_company = self._get_facts_for(companies)
         
         for company in companies:
-            facts = self.facts_index.get_by_company(company)
+            facts = facts_by_company[company]
             if not facts:
                 continue
             
-            fact = facts[0]
+            normalized = self.facts_index.normalized(facts[0])
             score = 0
             details = {}
             
+            # Read the normalized fields once for all criteria
+            values = (normalized["stipend_amount"], normalized["cgpa_required"], normalized["num_rounds"])
             for criterion in criteria:
-                if criterion == "stipend":
-                    stipend = fact.get("stipend_salary", {})
-                    if isinstance(stipend, dict):
-                        val = self._parse_number(stipend.get("amount"))
-                    else:
-                        val = self._parse_number(stipend)
-                    
-                    if val:
-                        score += val / 10000  # Normalize
-                        details["stipend"] = val
-                
-                elif criterion == "low_cgpa":
-                    elig = fact.get("eligibility", {})
-                    if isinstance(elig, dict):
-                        cgpa = self._parse_number(elig.get("cgpa_pg") or elig.get("cgpa_ug"))
-                        if cgpa:
-                            score += (10 - cgpa)  # Lower is better
-                            details["cgpa"] = cgpa
-                
-                elif criterion == "few_rounds":
-                    process = fact.get("selection_process", [])
-                    rounds = len(process) if isinstance(process, list) else 0
-                    if rounds > 0:
-                        score += (10 - rounds)  # Fewer is better
-                        details["rounds"] = rounds
+                scorer = _CRIT_SCORE.get(criterion)
+                if scorer:
+                    score += scorer(*values, details)
             
             scores[company] = {"score": score, "details": details}
         
-        # Sort by score
-        ranked = sorted(scores.items(), key=lambda x: x[1]["score"], reverse=True)
-        
-        best = ranked[0] if ranked else None
+        # Only the top entry is needed; first encountered wins ties
+        best = max(scores.items(), key=lambda x: x[1]["score"], default=None)
         
         return ToolResult(
             success=True,
             data={
                 "best_company": best[0] if best else None,
                 "best_score": best[1] if best else None,
-                "all_scores": dict(ranked),
+                "all_scores": scores,
                 "criteria": criteria
             },
             message=f"Best company: {best[0] if best else 'N/A'} based on {', '.join(criteria)}",
             tool_name=self.name,
             query=f"best_for:{','.join(criteria)}"
         )
-    
-    def _parse_number(self, value: Any) -> Optional[float]:
-        """Parse numeric value."""
-        if value is None:
-            return None
-        if isinstance(value, (int, float)):
-            return float(value)
-        
-        import re
-        numbers = re.findall(r'[\d.]+', str(value).replace(',', ''))
-        if numbers:
-            try:
-                return float(numbers[0])
-            except:
-                pass
-        return None
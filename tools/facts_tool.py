@@ -4,11 +4,84 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 from tools.base_tool import BaseTool, ToolResult
 from rag.facts_index import FactsIndex
 
 
+def _cgpa(f: Dict[str, Any]) -> Any:
+    elig = f.get("eligibility", {})
+    return elig.get("cgpa_pg") or elig.get("cgpa_ug") if isinstance(elig, dict) else None
+
+
+def _branches(f: Dict[str, Any]) -> List[str]:
+    elig = f.get("eligibility", {})
+    return elig.get("branches", []) if isinstance(elig, dict) else []
+
+
+def _stipend_amount(f: Dict[str, Any]) -> Any:
+    stipend = f.get("stipend_salary", {})
+    return stipend.get("amount", "N/A") if isinstance(stipend, dict) else stipend
+
+
+def _num_rounds(f: Dict[str, Any]) -> int:
+    process = f.get("selection_process", [])
+    return len(process) if isinstance(process, list) else 0
+
+
+# Output rows per view, built once per fact when the index is loaded from
+# the fact and its normalized fields (FactsIndex.normalized)
+_PROJECTIONS = {
+    "details": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "stipend": f.get("stipend_salary"),
+        "duration": f.get("duration"),
+        "location": f.get("location"),
+        "work_mode": f.get("work_mode"),
+        "eligibility": f.get("eligibility"),
+        "selection_process": f.get("selection_process"),
+        "apply_before": f.get("apply_before")
+    },
+    "stipend": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "stipend": _stipend_amount(f),
+        "location": f.get("location")
+    },
+    "cgpa": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "cgpa_required": _cgpa(f),
+        "stipend": f.get("stipend_salary")
+    },
+    "location": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "location": f.get("location"),
+        "stipend": f.get("stipend_salary")
+    },
+    "branch": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "eligible_branches": _branches(f),
+        "stipend": f.get("stipend_salary")
+    },
+    "eligibility": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "eligibility": f.get("eligibility", {})
+    },
+    "selection": lambda f, n: {
+        "company": f.get("company_name"),
+        "role": n["role"],
+        "selection_process": f.get("selection_process", []),
+        "num_rounds": _num_rounds(f)
+    },
+}
+
+
 class FactsLookupTool(BaseTool):
     """
     Tool for querying structured placement facts.
@@ -34,6 +107,39 @@ class FactsLookupTool(BaseTool):
         """Ensure index is loaded."""
         if not self._loaded:
             self._loaded = self.index.load()
+            if self._loaded:
+                # Exact names are a hash hit in the index, but partial names scan
+                # its keys; memoize per normalized name for a loaded index
+                self._facts_by_company = lru_cache(maxsize=1024)(
+                    lambda name: tuple(self.index.get_by_company(name))
+                )
+                facts = self.index.facts
+                self._projected = {
+                    view: [project(f, self.index.normalized(f)) for f in facts]
+                    for view, project in _PROJECTIONS.items()
+                }
+                self._stipend_rows = [
+                    self._format_stipend(s) for s in self.index.get_all_stipends()
+                ]
+    
+    def _get_facts(self, company: str) -> Tuple[Dict[str, Any], ...]:
+        """Facts for a company (memoized)."""
+        return self._facts_by_company(company.strip().lower())
+    
+    def _rows(self, view: str, facts=None) -> List[Dict[str, Any]]:
+        """
+        Output rows of a view for the given facts (all facts if None).
+        
+        Rows are copies of the precomputed ones, so callers can set keys
+        without touching the shared rows.
+        """
+        rows = self._projected[view]
+        if facts is not None:
+            # Index queries return the loaded fact dicts themselves, so rows
+            # can be found by the identity of the fact
+            positions = self.index._fact_positions
+            rows = [rows[positions[id(f)]] for f in facts]
+        return [dict(r) for r in rows]
     
     def _get_parameters(self) -> Dict[str, Any]:
         return {
@@ -193,7 +299,7 @@ class FactsLookupTool(BaseTool):
                 query="get_company_details"
             )
         
-        facts = self.index.get_by_company(company)
+        facts = self._get_facts(company)
         if not facts:
             return ToolResult(
                 success=False,
@@ -203,20 +309,7 @@ class FactsLookupTool(BaseTool):
                 query=f"get_company_details:{company}"
             )
         
-        # Format the output
-        formatted = []
-        for f in facts:
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "stipend": f.get("stipend_salary"),
-                "duration": f.get("duration"),
-                "location": f.get("location"),
-                "work_mode": f.get("work_mode"),
-                "eligibility": f.get("eligibility"),
-                "selection_process": f.get("selection_process"),
-                "apply_before": f.get("apply_before")
-            })
+        formatted = self._rows("details", facts)
         
         return ToolResult(
             success=True,
@@ -228,25 +321,8 @@ class FactsLookupTool(BaseTool):
     
     def _get_all_stipends(self) -> ToolResult:
         """Get stipend info for all companies."""
-        stipends = self.index.get_all_stipends()
-        
-        # Format nicely
-        formatted = []
-        for s in stipends:
-            stipend_val = s.get("stipend", "N/A")
-            if isinstance(stipend_val, dict):
-                amount = stipend_val.get("amount", "N/A")
-                currency = stipend_val.get("currency", "INR")
-                period = stipend_val.get("period", "per month")
-                stipend_str = f"{amount} {currency} {period}"
-            else:
-                stipend_str = str(stipend_val) if stipend_val else "N/A"
-            
-            formatted.append({
-                "company": s.get("company"),
-                "role": s.get("role_title") or s.get("role"),
-                "stipend": stipend_str
-            })
+        # Formatted once at load; copied so callers can't modify the shared rows
+        formatted = [dict(r) for r in self._stipend_rows]
         
         return ToolResult(
             success=True,
@@ -256,24 +332,32 @@ class FactsLookupTool(BaseTool):
             query="get_all_stipends"
         )
     
+    @staticmethod
+    def _format_stipend(s: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a get_all_stipends entry for output."""
+        stipend_val = s.get("stipend", "N/A")
+        if isinstance(stipend_val, dict):
+            amount = stipend_val.get("amount", "N/A")
+            currency = stipend_val.get("currency", "INR")
+            period = stipend_val.get("period", "per month")
+            stipend_str = f"{amount} {currency} {period}"
+        else:
+            stipend_str = str(stipend_val) if stipend_val else "N/A"
+        
+        return {
+            "company": s.get("company"),
+            "role": s.get("role_title") or s.get("role"),
+            "stipend": stipend_str
+        }
+    
     def _filter_by_stipend(self, min_val: float = None, max_val: float = None) -> ToolResult:
         """Filter companies by stipend range."""
-        facts = self.index.filter_by_stipend(min_amount=min_val, max_amount=max_val)
-        
-        formatted = []
-        for f in facts:
-            stipend = f.get("stipend_salary", {})
-            if isinstance(stipend, dict):
-                amount = stipend.get("amount", "N/A")
-            else:
-                amount = stipend
-            
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "stipend": amount,
-                "location": f.get("location")
-            })
+        if min_val is None and max_val is None:
+            # No bounds: every role, in fact order
+            formatted = self._rows("stipend")
+        else:
+            facts = self.index.filter_by_stipend(min_amount=min_val, max_amount=max_val)
+            formatted = self._rows("stipend", facts)
         
         criteria = []
         if min_val:
@@ -301,18 +385,7 @@ class FactsLookupTool(BaseTool):
             )
         
         facts = self.index.filter_by_cgpa(max_cgpa_required=max_cgpa)
-        
-        formatted = []
-        for f in facts:
-            elig = f.get("eligibility", {})
-            cgpa = elig.get("cgpa_pg") or elig.get("cgpa_ug") if isinstance(elig, dict) else None
-            
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "cgpa_required": cgpa,
-                "stipend": f.get("stipend_salary")
-            })
+        formatted = self._rows("cgpa", facts)
         
         return ToolResult(
             success=True,
@@ -324,7 +397,7 @@ class FactsLookupTool(BaseTool):
     
     def _filter_by_location(self, location: str) -> ToolResult:
         """Filter companies by location."""
-        if not location:
+        if not location or not location.strip():
             return ToolResult(
                 success=False,
                 data=None,
@@ -334,15 +407,7 @@ class FactsLookupTool(BaseTool):
             )
         
         facts = self.index.filter_by_location(location)
-        
-        formatted = []
-        for f in facts:
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "location": f.get("location"),
-                "stipend": f.get("stipend_salary")
-            })
+        formatted = self._rows("location", facts)
         
         return ToolResult(
             success=True,
@@ -354,7 +419,7 @@ class FactsLookupTool(BaseTool):
     
     def _filter_by_branch(self, branch: str) -> ToolResult:
         """Filter companies by eligible branch."""
-        if not branch:
+        if not branch or not branch.strip():
             return ToolResult(
                 success=False,
                 data=None,
@@ -364,18 +429,7 @@ class FactsLookupTool(BaseTool):
             )
         
         facts = self.index.filter_by_branch(branch)
-        
-        formatted = []
-        for f in facts:
-            elig = f.get("eligibility", {})
-            branches = elig.get("branches", []) if isinstance(elig, dict) else []
-            
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "eligible_branches": branches,
-                "stipend": f.get("stipend_salary")
-            })
+        formatted = self._rows("branch", facts)
         
         return ToolResult(
             success=True,
@@ -410,18 +464,9 @@ class FactsLookupTool(BaseTool):
     def _get_eligibility(self, company: str = None) -> ToolResult:
         """Get eligibility criteria."""
         if company:
-            facts = self.index.get_by_company(company)
+            formatted = self._rows("eligibility", self._get_facts(company))
         else:
-            facts = self.index.facts
-        
-        formatted = []
-        for f in facts:
-            elig = f.get("eligibility", {})
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "eligibility": elig
-            })
+            formatted = self._rows("eligibility")
         
         return ToolResult(
             success=True,
@@ -434,19 +479,9 @@ class FactsLookupTool(BaseTool):
     def _get_selection_process(self, company: str = None) -> ToolResult:
         """Get selection process details."""
         if company:
-            facts = self.index.get_by_company(company)
+            formatted = self._rows("selection", self._get_facts(company))
         else:
-            facts = self.index.facts
-        
-        formatted = []
-        for f in facts:
-            process = f.get("selection_process", [])
-            formatted.append({
-                "company": f.get("company_name"),
-                "role": f.get("role_title") or f.get("role_name"),
-                "selection_process": process,
-                "num_rounds": len(process) if isinstance(process, list) else 0
-            })
+            formatted = self._rows("selection")
         
         return ToolResult(
             success=True,
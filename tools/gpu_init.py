@@ -0,0 +1,19 @@
+"""GPU selection for the runner scripts."""
+
+import os
+import sys
+
+
+def select_gpu(idx: int):
+    """
+    Pin the process to one GPU via CUDA_VISIBLE_DEVICES.
+    
+    Must run before torch is imported: once torch has initialized CUDA the
+    variable is ignored and the process would silently use the wrong GPU.
+    """
+    if "torch" in sys.modules:
+        raise RuntimeError(
+            f"select_gpu({idx}) called after torch was imported; "
+            "call it at the top of the entry script"
+        )
+    os.environ["CUDA_VISIBLE_DEVICES"] = str(idx)
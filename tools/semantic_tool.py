@@ -1,10 +1,16 @@
 """Semantic RAG Tool for contextual/descriptive queries."""
 
+import heapq
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
 from tools.base_tool import BaseTool, ToolResult
 from rag.semantic_index import SemanticIndex
 
@@ -26,14 +32,135 @@ class SemanticRAGTool(BaseTool):
     skills required, interview processes, company culture, responsibilities, etc. 
     Use for contextual queries that need understanding of text content."""
     
+    # Max memoized search results (cleared when full)
+    SEARCH_CACHE_SIZE = 512
+    # Minimum similarity for a chunk to be returned
+    SEARCH_THRESHOLD = 0.2
+    
     def __init__(self):
         self.index = SemanticIndex()
         self._loaded = False
+        # (query, type filter, company, top_k, threshold) -> (result rows, context string)
+        self._search_cache: Dict[tuple, Tuple[Tuple[Dict[str, Any], ...], str]] = {}
     
     def _ensure_loaded(self):
         """Ensure index is loaded."""
         if not self._loaded:
             self._loaded = self.index.load()
+            if self._loaded:
+                # Results are pure for a loaded index; memoize per normalized request
+                self._search_cache = {}
+                self._skills_search = lru_cache(maxsize=512)(self._run_skills_search)
+                self._company_chunks = lru_cache(maxsize=128)(self._group_company_chunks)
+    
+    def _search_key(self, query: str, search_type: str, company: Optional[str], top_k: int) -> tuple:
+        """Memo key: whitespace-normalized query, type filter, company, top_k, threshold."""
+        type_filter = None if search_type == "general" else search_type
+        return (' '.join(query.split()), type_filter, company, top_k, self.SEARCH_THRESHOLD)
+    
+    def _search(self, key: tuple) -> Tuple[Tuple[Dict[str, Any], ...], str]:
+        """Formatted (results, context string) for a search key (memoized)."""
+        cached = self._search_cache.get(key)
+        if cached is None:
+            cached = self._run_search(key)
+            self._remember(key, cached)
+        return cached
+    
+    def _remember(self, key: tuple, value: Tuple[Tuple[Dict[str, Any], ...], str]):
+        if len(self._search_cache) >= self.SEARCH_CACHE_SIZE:
+            self._search_cache.clear()
+        self._search_cache[key] = value
+    
+    def _run_search(
+        self,
+        key: tuple,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Tuple[Tuple[Dict[str, Any], ...], str]:
+        """Search the index and format the hits as (results, context string)."""
+        query, type_filter, company, top_k, threshold = key
+        if query_embedding is None:
+            query_embedding = self.index.encode_batch([query])[0]
+        results = self.index.search_with_embedding(
+            query_embedding,
+            top_k=top_k,
+            filter_company=company,
+            filter_type=type_filter,
+            threshold=threshold
+        )
+        return self._format_results(results)
+    
+    def _run_skills_search(
+        self,
+        query: str,
+        company: Optional[str],
+        top_k: int
+    ) -> Tuple[Dict[str, Any], ...]:
+        """Top required + optional skill chunks, from a single query embedding."""
+        query_embedding = self.index.encode_batch([query])[0]
+        
+        all_results = []
+        for skill_type in ("skills_required", "skills_optional"):
+            results = self.index.search_with_embedding(
+                query_embedding,
+                top_k=top_k,
+                filter_company=company,
+                filter_type=skill_type,
+                threshold=self.SEARCH_THRESHOLD
+            )
+            all_results.extend(self._format_rows(results))
+        
+        # Merge by relevance (ties keep required before optional); every
+        # formatted row has a relevance_score
+        return tuple(heapq.nlargest(top_k, all_results, key=itemgetter("relevance_score")))
+    
+    def _group_company_chunks(self, company: str) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+        """A company's chunks grouped by type, plus the total chunk count."""
+        chunks = self.index.get_all_by_company(company)
+        
+        # Group by type, in order of first appearance
+        by_type = {}
+        for chunk in chunks:
+            by_type.setdefault(chunk.get("type", "other"), []).append({
+                "role": chunk.get("role"),
+                "content": chunk.get("text"),
+                "source": chunk.get("source")
+            })
+        return by_type, len(chunks)
+    
+    @staticmethod
+    def _format_rows(results: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+        """Format index hits as result rows."""
+        # Round all scores in one vectorized pass
+        scores = np.round(
+            np.fromiter((r.get("score", 0) for r in results), dtype=np.float64, count=len(results)),
+            4
+        ).tolist()
+        return tuple(
+            {
+                "company": r.get("company"),
+                "role": r.get("role"),
+                "type": r.get("type"),
+                "content": r.get("text"),
+                "relevance_score": score,
+                "source": r.get("source")
+            }
+            for r, score in zip(results, scores)
+        )
+    
+    @classmethod
+    def _format_results(
+        cls,
+        results: List[Dict[str, Any]]
+    ) -> Tuple[Tuple[Dict[str, Any], ...], str]:
+        """Format index hits as (result rows, context string)."""
+        formatted = cls._format_rows(results)
+        
+        # Build context string for easy consumption
+        context = "\n\n---\n\n".join(
+            f"[{r['company']} - {r['role']}] ({r['type']})\n{r['content']}"
+            for r in formatted
+        )
+        return formatted, context
     
     def _get_parameters(self) -> Dict[str, Any]:
         return {
@@ -116,63 +243,9 @@ class SemanticRAGTool(BaseTool):
             )
         
         try:
-            # Determine filter type
-            type_filter = None if search_type == "general" else search_type
-            
-            # Perform search
-            results = self.index.search(
-                query=query,
-                top_k=top_k,
-                filter_company=company,
-                filter_type=type_filter,
-                threshold=0.2
-            )
-            
-            if not results:
-                return ToolResult(
-                    success=True,
-                    data={"results": [], "count": 0},
-                    message=f"No relevant results found for: {query}",
-                    tool_name=self.name,
-                    query=query
-                )
-            
-            # Format results
-            formatted = []
-            for r in results:
-                formatted.append({
-                    "company": r.get("company"),
-                    "role": r.get("role"),
-                    "type": r.get("type"),
-                    "content": r.get("text"),
-                    "relevance_score": round(r.get("score", 0), 4),
-                    "source": r.get("source")
-                })
-            
-            # Build context string for easy consumption
-            context_parts = []
-            for r in formatted:
-                context_parts.append(
-                    f"[{r['company']} - {r['role']}] ({r['type']})\n{r['content']}"
-                )
-            context = "\n\n---\n\n".join(context_parts)
-            
-            return ToolResult(
-                success=True,
-                data={
-                    "results": formatted,
-                    "count": len(formatted),
-                    "context": context,
-                    "query": query,
-                    "filters": {
-                        "type": search_type,
-                        "company": company
-                    }
-                },
-                message=f"Found {len(formatted)} relevant results",
-                tool_name=self.name,
-                query=query
-            )
+            # Perform search (cached)
+            formatted, context = self._search(self._search_key(query, search_type, company, top_k))
+            return self._search_result(query, search_type, company, formatted, context)
             
         except Exception as e:
             return ToolResult(
@@ -183,41 +256,113 @@ class SemanticRAGTool(BaseTool):
                 query=query
             )
     
-    def search_skills(self, query: str, company: str = None, top_k: int = 5) -> ToolResult:
-        """Convenience method to search for skills."""
-        # Search both required and optional skills
-        required = self.execute(
-            query=query,
-            search_type="skills_required",
-            company=company,
-            top_k=top_k
-        )
+    def execute_batch(self, requests: List[Dict[str, Any]]) -> List[ToolResult]:
+        """
+        Execute several semantic searches (each a dict of execute() arguments).
         
-        optional = self.execute(
-            query=query,
-            search_type="skills_optional",
-            company=company,
-            top_k=top_k
-        )
+        Queries that aren't cached are embedded together in one encoder pass.
+        Returns one ToolResult per request, in order.
+        """
+        self._ensure_loaded()
         
-        # Combine results
-        all_results = []
-        if required.success and required.data:
-            all_results.extend(required.data.get("results", []))
-        if optional.success and optional.data:
-            all_results.extend(optional.data.get("results", []))
+        requests = [
+            {"search_type": "general", "company": None, "top_k": 5, **request}
+            for request in requests
+        ]
+        if not self._loaded or not all(r.get("query") for r in requests):
+            # Nothing to batch; report the same errors as execute
+            return [self.execute(**r) for r in requests]
+        
+        keys = [
+            self._search_key(r["query"], r["search_type"], r["company"], r["top_k"])
+            for r in requests
+        ]
+        searched = {}
+        misses = list(dict.fromkeys(k for k in keys if k not in self._search_cache))
+        if misses:
+            try:
+                embeddings = self.index.encode_batch([k[0] for k in misses])
+            except Exception:
+                # Run the misses one by one below instead
+                embeddings = []
+            for key, embedding in zip(misses, embeddings):
+                try:
+                    searched[key] = self._run_search(key, embedding)
+                except Exception:
+                    continue
+                self._remember(key, searched[key])
+        
+        results = []
+        for r, key in zip(requests, keys):
+            cached = searched.get(key) or self._search_cache.get(key)
+            if cached is None:
+                # Its batched search failed; execute reports the error for this request only
+                results.append(self.execute(**r))
+                continue
+            formatted, context = cached
+            results.append(
+                self._search_result(r["query"], r["search_type"], r["company"], formatted, context)
+            )
+        return results
+    
+    def _search_result(
+        self,
+        query: str,
+        search_type: str,
+        company: Optional[str],
+        formatted: Tuple[Dict[str, Any], ...],
+        context: str
+    ) -> ToolResult:
+        """Build the ToolResult for formatted search hits (copies of the memoized rows)."""
+        if not formatted:
+            return ToolResult(
+                success=True,
+                data={"results": [], "count": 0},
+                message=f"No relevant results found for: {query}",
+                tool_name=self.name,
+                query=query
+            )
         
-        # Sort by relevance
-        all_results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        return ToolResult(
+            success=True,
+            data={
+                "results": [dict(r) for r in formatted],
+                "count": len(formatted),
+                "context": context,
+                "query": query,
+                "filters": {
+                    "type": search_type,
+                    "company": company
+                }
+            },
+            message=f"Found {len(formatted)} relevant results",
+            tool_name=self.name,
+            query=query
+        )
+    
+    def search_skills(self, query: str, company: str = None, top_k: int = 5) -> ToolResult:
+        """Convenience method to search for skills."""
+        self._ensure_loaded()
+        
+        # Search both required and optional skills (cached, so rows are copied);
+        # as with the two separate searches before, a failed search yields no results
+        results = []
+        if self._loaded and query:
+            try:
+                results = [
+                    dict(r) for r in self._skills_search(' '.join(query.split()), company, top_k)
+                ]
+            except Exception:
+                pass
         
         return ToolResult(
             success=True,
             data={
-                "results": all_results[:top_k],
-                "count": len(all_results[:top_k]),
+                "results": results,
+                "count": len(results),
                 "query": query
             },
-            message=f"Found {len(all_results[:top_k])} skill-related results",
+            message=f"Found {len(results)} skill-related results",
             tool_name=self.name,
             query=f"skills:{query}"
         )
@@ -246,9 +391,12 @@ class SemanticRAGTool(BaseTool):
         """Get all semantic chunks for a specific company."""
         self._ensure_loaded()
         
-        chunks = self.index.get_all_by_company(company)
+        # Company matching is case-insensitive, so cache per lowercased name
+        by_type, total = self._company_chunks(company.lower()) if self._loaded else ({}, 0)
+        # The grouping is cached; hand out copies so callers can't modify it
+        by_type = {t: [dict(c) for c in chunks] for t, chunks in by_type.items()}
         
-        if not chunks:
+        if not total:
             return ToolResult(
                 success=False,
                 data=None,
@@ -257,26 +405,14 @@ class SemanticRAGTool(BaseTool):
                 query=f"all_chunks:{company}"
             )
         
-        # Group by type
-        by_type = {}
-        for chunk in chunks:
-            t = chunk.get("type", "other")
-            if t not in by_type:
-                by_type[t] = []
-            by_type[t].append({
-                "role": chunk.get("role"),
-                "content": chunk.get("text"),
-                "source": chunk.get("source")
-            })
-        
         return ToolResult(
             success=True,
             data={
                 "company": company,
                 "chunks_by_type": by_type,
-                "total_chunks": len(chunks)
+                "total_chunks": total
             },
-            message=f"Found {len(chunks)} chunks for {company}",
+            message=f"Found {total} chunks for {company}",
             tool_name=self.name,
             query=f"all_chunks:{company}"
         )
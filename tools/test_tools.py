@@ -8,6 +8,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools import FactsLookupTool, SemanticRAGTool, CompareCompaniesTool
 
+# One instance per tool class, shared by all tests
+_TOOLS = {}
+
+
+def _tool(cls):
+    """Shared instance of a tool class."""
+    if cls not in _TOOLS:
+        _TOOLS[cls] = cls()
+    return _TOOLS[cls]
+
 
 def test_facts_tool():
     """Test Facts Lookup Tool."""
@@ -15,7 +25,7 @@ def test_facts_tool():
     print("TESTING FACTS LOOKUP TOOL")
     print("=" * 70)
     
-    tool = FactsLookupTool()
+    tool = _tool(FactsLookupTool)
     
     # Test 1: Get all companies
     print("\n📋 Test 1: Get all companies")
@@ -60,7 +70,7 @@ def test_semantic_tool():
     print("TESTING SEMANTIC RAG TOOL")
     print("=" * 70)
     
-    tool = SemanticRAGTool()
+    tool = _tool(SemanticRAGTool)
     
     # Test 1: General search
     print("\n🔍 Test 1: Search 'Python machine learning'")
@@ -105,10 +115,10 @@ def test_compare_tool():
     print("TESTING COMPARE COMPANIES TOOL")
     print("=" * 70)
     
-    tool = CompareCompaniesTool()
+    tool = _tool(CompareCompaniesTool)
     
     # Get some companies first
-    facts_tool = FactsLookupTool()
+    facts_tool = _tool(FactsLookupTool)
     companies_result = facts_tool.execute(action="get_all_companies")
     if not companies_result.success:
         print("   Could not get companies list")
@@ -4,7 +4,6 @@ Run Streamlit through Jupyter's proxy for cloud machines.
 Access via: https://45.112.150.236/user/<username>/proxy/8501/
 """
 
-import subprocess
 import sys
 import os
 
@@ -12,8 +11,8 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     app_path = os.path.join(script_dir, "streamlit_app.py")
     
-    # Run streamlit with settings for Jupyter proxy
-    subprocess.run([
+    # Run streamlit with settings for Jupyter proxy (replaces this process)
+    os.execv(sys.executable, [
         sys.executable, "-m", "streamlit", "run",
         app_path,
         "--server.port", "8501",
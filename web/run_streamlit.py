@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """Launch script for Streamlit app."""
 
-import subprocess
 import sys
 import os
 
@@ -10,8 +9,8 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     app_path = os.path.join(script_dir, "streamlit_app.py")
     
-    # Run streamlit
-    subprocess.run([
+    # Run streamlit (replaces this process instead of waiting on a child)
+    os.execv(sys.executable, [
         sys.executable, "-m", "streamlit", "run", 
         app_path,
         "--server.port", "8501",
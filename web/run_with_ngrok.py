@@ -4,54 +4,107 @@
 import subprocess
 import sys
 import os
+import json
 import time
-import threading
+import urllib.request
+
+PORT = 8501
+# Local API of a running ngrok agent
+NGROK_API = "http://127.0.0.1:4040/api/tunnels"
+# Streamlit's readiness endpoint
+HEALTH_URL = f"http://127.0.0.1:{PORT}/_stcore/health"
 
 def run_streamlit():
-    """Run streamlit server."""
+    """Run streamlit server (replaces this process)."""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     app_path = os.path.join(script_dir, "streamlit_app.py")
     
-    subprocess.run([
+    os.execv(sys.executable, [
         sys.executable, "-m", "streamlit", "run",
         app_path,
-        "--server.port", "8501",
+        "--server.port", str(PORT),
         "--server.address", "127.0.0.1",
         "--server.headless", "true",
     ])
 
-def run_ngrok():
-    """Run ngrok tunnel."""
+def streamlit_running() -> bool:
+    """Whether a streamlit server is already serving on PORT."""
+    try:
+        with urllib.request.urlopen(HEALTH_URL, timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+def existing_tunnel():
+    """Public URL of a tunnel to PORT left by an earlier launch, if still up."""
     try:
-        from pyngrok import ngrok
+        with urllib.request.urlopen(NGROK_API, timeout=1) as response:
+            tunnels = json.load(response).get("tunnels", [])
+    except (OSError, ValueError):
+        return None
+    for tunnel in tunnels:
+        if tunnel.get("config", {}).get("addr", "").endswith(f":{PORT}"):
+            return tunnel.get("public_url")
+    return None
+
+def start_ngrok():
+    """
+    Start the ngrok binary as its own process and wait for its tunnel.
+    
+    Its output goes to /dev/null rather than a pipe read by this process,
+    so the tunnel keeps running after we exec into streamlit. It also gets
+    its own session, so stopping streamlit with Ctrl-C leaves the tunnel up
+    for the next launch to reuse.
+    """
+    from pyngrok import conf, ngrok
+    
+    config = conf.get_default()
+    ngrok.install_ngrok(config)
+    subprocess.Popen(
+        [config.ngrok_path, "http", str(PORT), "--log", "stdout"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(50):
+        public_url = existing_tunnel()
+        if public_url is not None:
+            return public_url
+        time.sleep(0.2)
+    raise RuntimeError("tunnel did not come up within 10s")
+
+def run_ngrok() -> bool:
+    """Start ngrok tunnel (the ngrok process keeps running alongside streamlit)."""
+    try:
+        # Reuse a tunnel that is still running instead of opening a new one
+        public_url = existing_tunnel()
+        if public_url is None:
+            # Start tunnel; it forwards to the port streamlit is about to serve
+            public_url = start_ngrok()
         
-        # Start tunnel
-        public_url = ngrok.connect(8501)
         print("\n" + "="*60)
         print("🌐 PUBLIC URL (share this!):")
         print(f"   {public_url}")
         print("="*60 + "\n")
-        
-        # Keep running
-        ngrok_process = ngrok.get_ngrok_process()
-        ngrok_process.proc.wait()
+        return True
         
     except ImportError:
         print("❌ pyngrok not installed. Run: pip install pyngrok")
     except Exception as e:
         print(f"❌ ngrok error: {e}")
+    return False
 
 def main():
     print("🚀 Starting Placement Assistant with ngrok tunnel...")
     
-    # Start streamlit in background
-    streamlit_thread = threading.Thread(target=run_streamlit, daemon=True)
-    streamlit_thread.start()
-    
-    time.sleep(5)  # Wait for streamlit to start
-    
-    # Start ngrok
-    run_ngrok()
+    # Start ngrok first, then become the streamlit server (unless one from an
+    # earlier launch is still serving; a second one couldn't bind the port)
+    if run_ngrok():
+        if streamlit_running():
+            print("✅ Streamlit is already running")
+        else:
+            run_streamlit()
 
 if __name__ == "__main__":
     main()
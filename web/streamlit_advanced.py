@@ -4,8 +4,8 @@ import streamlit as st
 import sys
 import os
 import time
-import json
-import pandas as pd
+import numpy as np
+import orjson
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -17,8 +17,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# CSS
-st.markdown("""
+# CSS (raw HTML, so it skips the Markdown parser)
+st.html("""
 <style>
     .debug-box {
         background-color: #f0f0f0;
@@ -30,7 +30,10 @@ st.markdown("""
         overflow-y: auto;
     }
 </style>
-""", unsafe_allow_html=True)
+""")
+
+# Chat turns rendered on every rerun; older ones are archived and shown on demand
+HISTORY_SHOWN = 20
 
 
 @st.cache_resource
@@ -40,6 +43,43 @@ def load_agent():
         return create_agent(use_llm=True)
 
 
+@st.cache_data(ttl=86400)
+def load_companies(_agent):
+    """
+    Company names for the browser: the names, their lowercased forms and
+    trigram postings (trigram -> sorted name positions) over those forms.
+    """
+    companies = _agent.get_companies()
+    lowered = [c.lower() for c in companies]
+    
+    postings = {}
+    for i, name in enumerate(lowered):
+        for gram in {name[j:j + 3] for j in range(len(name) - 2)}:
+            postings.setdefault(gram, []).append(i)
+    trigrams = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+    
+    return np.array(companies, dtype=object), np.array(lowered, dtype=str), trigrams
+
+
+def filter_companies(search: str, companies, companies_lower, trigrams):
+    """Companies whose name contains search (case-insensitive), in order."""
+    search = search.lower()
+    if len(search) < 3:
+        return companies[np.char.find(companies_lower, search) >= 0]
+    
+    # A name containing the search contains each of its trigrams, so only
+    # names in every posting list need the substring check
+    candidates = None
+    for gram in {search[j:j + 3] for j in range(len(search) - 2)}:
+        ids = trigrams.get(gram)
+        if ids is None:
+            return companies[:0]
+        candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+    
+    matches = np.char.find(companies_lower[candidates], search) >= 0
+    return companies[candidates[matches]]
+
+
 def main():
     st.title("🎓 Placement Assistant (Advanced Mode)")
     
@@ -71,11 +111,14 @@ def main():
         
         if st.button("🗑️ Clear History"):
             st.session_state.chat_history = []
+            st.session_state.chat_history_archive = []
             st.rerun()
     
     # Initialize
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "chat_history_archive" not in st.session_state:
+        st.session_state.chat_history_archive = []
     
     agent = load_agent()
     
@@ -84,65 +127,99 @@ def main():
     
     # Display history
     with chat_container:
+        older_turns(debug_mode, show_raw_data)
         for entry in st.session_state.chat_history:
-            with st.chat_message("user"):
-                st.write(entry["query"])
-            
-            with st.chat_message("assistant"):
-                st.markdown(entry["response"])
-                
-                # Metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    conf = entry.get("confidence", 0)
-                    color = "green" if conf > 0.7 else "orange" if conf > 0.4 else "red"
-                    st.metric("Confidence", f"{conf:.0%}", delta_color="off")
-                with col2:
-                    st.metric("Time", f"{entry.get('time', 0):.2f}s")
-                with col3:
-                    st.metric("Intent", entry.get("intent", "N/A"))
-                with col4:
-                    st.metric("Retries", entry.get("retries", 0))
-                
-                # Debug info
-                if debug_mode and "debug" in entry:
-                    with st.expander("🔍 Debug Info"):
-                        st.json(entry["debug"])
-                
-                # Raw data
-                if show_raw_data and "raw_data" in entry:
-                    with st.expander("📊 Raw Data"):
-                        st.json(entry["raw_data"])
+            render_entry(entry, debug_mode, show_raw_data)
+    
+    # New turns are appended below the history already on the page,
+    # rather than replaying the whole history in another rerun
     
     # Handle quick query
     if "quick_query" in st.session_state:
         query = st.session_state.quick_query
         del st.session_state.quick_query
-        process_and_display(agent, query, debug_mode, show_raw_data)
-        st.rerun()
+        entry = process_and_display(agent, query, debug_mode, show_raw_data)
+        with chat_container:
+            render_entry(entry, debug_mode, show_raw_data)
     
     # Input
     query = st.chat_input("Ask about placements...")
     if query:
-        process_and_display(agent, query, debug_mode, show_raw_data)
-        st.rerun()
+        entry = process_and_display(agent, query, debug_mode, show_raw_data)
+        with chat_container:
+            render_entry(entry, debug_mode, show_raw_data)
     
     # Company browser
+    company_browser(agent)
+
+
+@st.fragment
+def company_browser(agent):
+    """
+    Company search and quick-query buttons. Typing in the search box only
+    reruns this fragment, not the whole page with the chat history.
+    """
     with st.expander("📚 Browse Companies"):
-        companies = agent.get_companies()
+        companies, companies_lower, trigrams = load_companies(agent)
         
         search = st.text_input("Search company:", "")
-        filtered = [c for c in companies if search.lower() in c.lower()] if search else companies
+        filtered = filter_companies(search, companies, companies_lower, trigrams) if search else companies
         
         cols = st.columns(4)
         for i, company in enumerate(filtered[:20]):
             with cols[i % 4]:
                 if st.button(company, key=f"company_{company}"):
                     st.session_state.quick_query = f"Tell me about {company} internship"
+                    # The query is handled by main(), so rerun the whole app
+                    st.rerun()
 
 
-def process_and_display(agent, query: str, debug_mode: bool, show_raw: bool):
-    """Process query and add to history."""
+def render_entry(entry: dict, debug_mode: bool, show_raw: bool):
+    """Render one chat turn (query, answer, metrics, debug/raw data)."""
+    with st.chat_message("user"):
+        st.write(entry["query"])
+    
+    with st.chat_message("assistant"):
+        st.markdown(entry["response"])
+        
+        # Metrics (formatted once, when the entry was created)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Confidence", entry["confidence_str"], delta_color="off")
+        with col2:
+            st.metric("Time", entry["time_str"])
+        with col3:
+            st.metric("Intent", entry.get("intent", "N/A"))
+        with col4:
+            st.metric("Retries", entry.get("retries", 0))
+        
+        # Debug info
+        if debug_mode and "debug" in entry:
+            with st.expander("🔍 Debug Info"):
+                st.code(entry["debug"], language="json")
+        
+        # Raw data
+        if show_raw and "raw_data" in entry:
+            with st.expander("📊 Raw Data"):
+                st.code(entry["raw_data"], language="json")
+
+
+@st.fragment
+def older_turns(debug_mode: bool, show_raw: bool):
+    """Archived chat turns, rendered only when asked for (toggling reruns just this)."""
+    archive = st.session_state.chat_history_archive
+    if archive and st.toggle(f"Show {len(archive)} older turns"):
+        for entry in archive:
+            render_entry(entry, debug_mode, show_raw)
+
+
+def to_json(data) -> str:
+    """Indented JSON for a debug panel (serialized once, when the entry is created)."""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str).decode()
+
+
+def process_and_display(agent, query: str, debug_mode: bool, show_raw: bool) -> dict:
+    """Process query, add it to history and return the new history entry."""
     
     start_time = time.time()
     
@@ -161,7 +238,7 @@ def process_and_display(agent, query: str, debug_mode: bool, show_raw: bool):
         }
         
         if debug_mode:
-            entry["debug"] = {
+            entry["debug"] = to_json({
                 "intent": response.plan.intent,
                 "tools_used": [t.get("tool") for t in response.plan.tools_to_use],
                 "companies_detected": response.plan.companies_mentioned,
@@ -172,28 +249,37 @@ def process_and_display(agent, query: str, debug_mode: bool, show_raw: bool):
                     "relevant": response.feedback.is_relevant,
                     "reasoning": response.feedback.reasoning
                 }
-            }
+            })
         
         if show_raw:
-            entry["raw_data"] = {
+            entry["raw_data"] = to_json({
                 "enriched_companies": list(response.execution.enriched_results.keys()) if response.execution.enriched_results else [],
                 "tool_results": [
                     {"tool": r.tool_name, "success": r.success, "message": r.message}
                     for r in response.execution.tool_results
                 ]
-            }
-        
-        st.session_state.chat_history.append(entry)
+            })
         
     except Exception as e:
-        st.session_state.chat_history.append({
+        entry = {
             "query": query,
             "response": f"❌ Error: {str(e)}",
             "confidence": 0,
             "time": time.time() - start_time,
             "intent": "error",
             "retries": 0
-        })
+        }
+    
+    # Metric strings, so replaying the history doesn't re-format them
+    entry["confidence_str"] = f"{entry['confidence']:.0%}"
+    entry["time_str"] = f"{entry['time']:.2f}s"
+    
+    history = st.session_state.chat_history
+    history.append(entry)
+    if len(history) > HISTORY_SHOWN:
+        st.session_state.chat_history_archive.extend(history[:-HISTORY_SHOWN])
+        del history[:-HISTORY_SHOWN]
+    return entry
 
 
 if __name__ == "__main__":
@@ -2,7 +2,9 @@
 
 import os
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,17 +17,92 @@ st.title("🎓 Placement RAG Assistant")
 
 # Import agent after streamlit config
 from agent.orchestrator import create_agent
+from agent.critic import confidence_level
+from agent.cache import ResponseCache
+
+
+# Most common traffic: answered in the background at startup so the
+# first click on an example is a cache hit
+EXAMPLE_QUERIES = [
+    "What is the selection process for Dell?",
+    "Companies hiring in Bangalore",
+    "Stipend offered by Intel",
+    "Skills required for data science roles",
+    "Compare Dell and Bosch",
+    "List companies with stipend > 40000",
+]
+
+
+def build_agent():
+    """Create the placement agent and its response cache (persisted on disk)."""
+    agent = create_agent(use_llm=True)
+    return agent, ResponseCache(retrieve_companies=agent.retrieved_companies)
+
+
+def answer_query(agent, response_cache, lock, query: str):
+    """Answer a query through the response cache, one agent query at a time."""
+    with lock:
+        # Cached answers skip planning and the LLM
+        response = response_cache.get(query, True)
+        if response is None:
+            response = agent.query(query, verbose=False)
+            response_cache.put(query, True, response)
+    return response
+
+
+def warm_example_queries(agent_future: Future, lock):
+    """Answer the example queries once the agent is built."""
+    try:
+        agent, response_cache = agent_future.result()
+    except Exception:
+        return
+    for query in EXAMPLE_QUERIES:
+        try:
+            answer_query(agent, response_cache, lock, query)
+        except Exception:
+            continue
 
 
 @st.cache_resource
+def start_agent():
+    """
+    Start building the agent in the background (once per process), followed
+    by the example-query warm-up. Returns (agent future, agent lock).
+    """
+    lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(build_agent)
+    executor.submit(warm_example_queries, future, lock)
+    executor.shutdown(wait=False)
+    return future, lock
+
+
 def load_agent():
-    """Load and cache the placement agent."""
-    return create_agent(use_llm=True)
+    """(agent, response cache, lock); waits for the background build if still running."""
+    future, lock = start_agent()
+    try:
+        agent, response_cache = future.result()
+    except Exception:
+        # Don't keep serving a failed build; retry on the next query
+        start_agent.clear()
+        raise
+    return agent, response_cache, lock
+
+
+@st.cache_data(ttl=86400)
+def load_companies():
+    """Sorted company names (looked up once per process, not per rerun)."""
+    # Only needs the facts index, so the page renders without waiting for the agent
+    from tools import FactsLookupTool
+    result = FactsLookupTool().execute(action="get_all_companies")
+    if result.success and result.data:
+        return tuple(sorted(result.data.get("companies", [])))
+    return ()
 
 
-# Load agent
-agent = load_agent()
-companies_list = agent.get_companies()
+# Load the agent (models, indices) and warm the example queries while the page renders
+start_agent()
+companies_list = load_companies()
 
 # Sidebar controls
 st.sidebar.header("⚙️ Query Options")
@@ -37,7 +114,7 @@ st.sidebar.markdown("---")
 st.sidebar.header("🏢 Filter by Company")
 company_filter = st.sidebar.selectbox(
     "Select Company (optional)",
-    options=["(none)"] + sorted(companies_list),
+    options=("(none)",) + companies_list,
     index=0
 )
 if company_filter == "(none)":
@@ -46,16 +123,7 @@ if company_filter == "(none)":
 st.sidebar.markdown("---")
 st.sidebar.header("💡 Example Queries")
 
-example_queries = [
-    "What is the selection process for Dell?",
-    "Companies hiring in Bangalore",
-    "Stipend offered by Intel",
-    "Skills required for data science roles",
-    "Compare Dell and Bosch",
-    "List companies with stipend > 40000",
-]
-
-for eq in example_queries:
+for eq in EXAMPLE_QUERIES:
     if st.sidebar.button(eq, key=f"ex_{eq[:15]}", use_container_width=True):
         st.session_state.query_input = eq
 
@@ -88,16 +156,26 @@ if submit and query.strip():
         start_time = time.time()
         
         try:
-            response = agent.query(actual_query, verbose=False)
-            elapsed = time.time() - start_time
+            agent, response_cache, lock = load_agent()
             
-            # Display answer
-            st.subheader("📝 Answer")
-            st.markdown(response.answer)
+            with lock:
+                response = response_cache.get(actual_query, True)
+                
+                # Display answer (streamed as it is generated unless cached)
+                st.subheader("📝 Answer")
+                if response is None:
+                    response, answer_chunks = agent.query_stream(actual_query, verbose=False)
+                    # Raises if generation fails midway, so a truncated
+                    # answer is reported as an error and never cached
+                    st.write_stream(answer_chunks)
+                    response_cache.put(actual_query, True, response)
+                else:
+                    st.markdown(response.answer)
+            elapsed = time.time() - start_time
             
             # Confidence indicator
             conf = response.feedback.confidence_score
-            conf_color = "green" if conf >= 0.7 else "orange" if conf >= 0.4 else "red"
+            conf_color = ("red", "orange", "green")[confidence_level(conf)]
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -209,7 +287,7 @@ else:
         st.metric("LLM Powered", "Yes ✅")
     
     st.markdown("### 🏢 Available Companies")
-    st.write(", ".join(sorted(companies_list)))
+    st.write(", ".join(companies_list))
 
 st.markdown("---")
 st.caption("🎓 Placement RAG Assistant • Built with Streamlit & LLM")